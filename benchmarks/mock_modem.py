@@ -0,0 +1,366 @@
+"""
+Mock Modem - Local stand-in for the Huawei web API used by benchmarks
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Run standalone to point main.py at it:
+    python benchmarks/mock_modem.py --port 8080 --hosts 50 --sms 200 --latency 30
+    python main.py -H 127.0.0.1:8080 -p anything
+"""
+
+import argparse
+import random
+import secrets
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+# Error codes returned like the real firmware
+ERROR_NOT_SUPPORTED = 100002
+ERROR_NO_RIGHTS = 100003
+ERROR_WRONG_SESSION = 125002
+
+MAC_FILTER_SLOTS = 10
+PUBLIC_ENDPOINTS = ("webserver/SesTokInfo", "webserver/token", "user/login", "user/state-login")
+
+
+def make_hosts(count: int, seed: int = 0) -> List[Dict[str, str]]:
+    """Deterministic wlan/host-list entries for count devices"""
+    rng = random.Random(seed)
+    hosts = []
+    for i in range(count):
+        mac = "02:{:02X}:{:02X}:{:02X}:{:02X}:{:02X}".format(*i.to_bytes(5, "big"))
+        hosts.append({
+            "MacAddress": mac,
+            "IpAddress": "10.{}.{}.{}".format((i >> 16) & 255, (i >> 8) & 255, i & 255),
+            "HostName": f"device-{i}",
+            "AssociatedTime": str(rng.randint(1, 86400)),
+            "InterfaceType": rng.choice(["Wireless", "Ethernet"]),
+        })
+    return hosts
+
+
+def make_sms(count: int, seed: int = 0) -> List[Dict[str, str]]:
+    """Deterministic inbox messages, newest first (Index counts down)"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    messages = []
+    for i in range(count):
+        messages.append({
+            "Smstat": str(rng.choice([0, 1])),
+            "Index": str(40000 + i),
+            "Phone": "+1555{:07d}".format(rng.randint(0, 9999999)),
+            "Content": f"Benchmark message {i} " + "x" * rng.randint(0, 100),
+            "Date": (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "Sca": "",
+            "SaveType": "4",
+            "Priority": "0",
+            "SmsType": "1",
+        })
+    messages.reverse()
+    return messages
+
+
+def to_xml(value) -> str:
+    """Serialize nested dicts/lists the way huaweisms expects to parse them"""
+    if isinstance(value, dict):
+        parts = []
+        for key, item in value.items():
+            items = item if isinstance(item, list) else [item]
+            parts.extend(f"<{key}>{to_xml(i)}</{key}>" for i in items)
+        return "".join(parts)
+    return "" if value is None else escape(str(value))
+
+
+class MockModem:
+    """
+    Emulates the modem endpoints HuaweiModem uses, from a background thread
+    on 127.0.0.1: session/token and login, device information, status,
+    signal, traffic, host list, MAC filter, SMS list/count/send, QoS and
+    device control. Credentials are not checked; sessions are, so expiry
+    and re-login can be exercised with session_ttl.
+
+    latency (+ up to jitter) seconds are added to every response. Each
+    request is recorded as (time.perf_counter(), method, path).
+    """
+
+    def __init__(self, port: int = 0, hosts: int = 10, sms: int = 50,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 session_ttl: Optional[float] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.session_ttl = session_ttl
+        self.hosts = make_hosts(hosts)
+        self.inbox = make_sms(sms)
+        self.outbox: List[Dict[str, str]] = []
+        self.mac_filter: List[str] = []
+        self.qos: Dict[str, Tuple[int, int]] = {}
+        self.requests: List[Tuple[float, str, str]] = []
+        self._sessions: Dict[str, Optional[float]] = {}  # session id -> login time
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        """Value for the --host option, e.g. 127.0.0.1:40123"""
+        return "127.0.0.1:{}".format(self._server.server_address[1])
+
+    def first_request_at(self) -> Optional[float]:
+        with self._lock:
+            return self.requests[0][0] if self.requests else None
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+
+    def expire_sessions(self):
+        """Invalidate every session, as a modem reboot or timeout would"""
+        with self._lock:
+            self._sessions.clear()
+
+    # Session handling
+
+    def _new_session(self) -> str:
+        session_id = secrets.token_hex(16)
+        with self._lock:
+            self._sessions[session_id] = None
+        return session_id
+
+    def _login(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._sessions[session_id] = time.monotonic()
+            return True
+
+    def _logged_in(self, session_id: Optional[str]) -> bool:
+        with self._lock:
+            login_time = self._sessions.get(session_id)
+            if login_time is None:
+                return False
+            if self.session_ttl is not None and time.monotonic() - login_time > self.session_ttl:
+                del self._sessions[session_id]
+                return False
+            return True
+
+    # Endpoint handlers return (body dict for <response>, or error code)
+
+    def _get(self, endpoint: str, session_id: Optional[str]):
+        if endpoint == "webserver/SesTokInfo":
+            return {"SesInfo": f"SessionID={self._new_session()}", "TokInfo": secrets.token_hex(16)}
+        if endpoint == "webserver/token":
+            return {"token": secrets.token_hex(16)}
+        if endpoint == "user/state-login":
+            return {"State": "0" if self._logged_in(session_id) else "-1",
+                    "Username": "admin", "password_type": "4"}
+        if endpoint == "device/information":
+            return {"DeviceName": "B535-333", "SerialNumber": "MOCK000000000001",
+                    "Imei": "860000000000001", "HardwareVersion": "WL1B535M",
+                    "SoftwareVersion": "11.0.2.1(H195SP1C983)", "MacAddress1": "00:11:22:33:44:55"}
+        if endpoint == "monitoring/status":
+            return {"ConnectionStatus": "901", "SignalIcon": str(random.randint(2, 5)),
+                    "CurrentNetworkType": "19", "CurrentWifiUser": str(len(self.hosts)),
+                    "WanIPAddress": "100.64.0.1", "PrimaryDns": "8.8.8.8"}
+        if endpoint == "device/signal":
+            return {"rsrp": f"{random.randint(-110, -80)}dBm", "rsrq": f"{random.randint(-15, -5)}dB",
+                    "rssi": f"{random.randint(-80, -50)}dBm", "sinr": f"{random.randint(0, 25)}dB"}
+        if endpoint == "monitoring/traffic-statistics":
+            return {"CurrentDownloadRate": str(random.randint(0, 10 ** 7)),
+                    "CurrentUploadRate": str(random.randint(0, 10 ** 6)),
+                    "TotalDownload": "123456789", "TotalUpload": "12345678"}
+        if endpoint == "wlan/host-list":
+            return {"Hosts": {"Host": self.hosts}}
+        if endpoint == "sms/sms-count":
+            unread = sum(1 for m in self.inbox if m["Smstat"] == "0")
+            return {"LocalUnread": unread, "LocalInbox": len(self.inbox),
+                    "LocalOutbox": len(self.outbox), "LocalMax": 500}
+        if endpoint == "wlan/multi-macfilter-settings":
+            with self._lock:
+                macs = list(self.mac_filter)
+            ssids = []
+            for index in range(2):
+                ssid = {"Index": index, "WifiMacFilterStatus": 2 if macs else 0}
+                for slot in range(MAC_FILTER_SLOTS):
+                    ssid[f"WifiMacFilterMac{slot}"] = macs[slot] if slot < len(macs) else ""
+                ssids.append(ssid)
+            return {"Ssids": {"Ssid": ssids}}
+        if endpoint == "qos/qos-setup":
+            with self._lock:
+                entries = [{"Mac": mac, "Status": 1, "UploadRate": up, "DownloadRate": down}
+                           for mac, (up, down) in self.qos.items()]
+            return {"QosList": {"Qos": entries}}
+        return ERROR_NOT_SUPPORTED
+
+    def _post(self, endpoint: str, session_id: Optional[str], body: str):
+        # Handled before parsing: huaweisms' quick_login posts a malformed
+        # XML declaration (<?xml version:"1.0" ...?>) that ElementTree rejects
+        if endpoint == "user/login":
+            return "OK" if self._login(session_id) else ERROR_WRONG_SESSION
+
+        try:
+            request = ET.fromstring(body) if body.strip() else ET.Element("request")
+        except ET.ParseError:
+            return ERROR_NOT_SUPPORTED
+        if endpoint == "sms/sms-list":
+            page = int(request.findtext("PageIndex") or 1)
+            count = int(request.findtext("ReadCount") or 20)
+            box = self.inbox if (request.findtext("BoxType") or "1") == "1" else self.outbox
+            messages = box[(page - 1) * count:page * count]
+            return {"Count": len(messages), "Messages": {"Message": messages}}
+        if endpoint == "sms/send-sms":
+            with self._lock:
+                for phone in request.iter("Phone"):
+                    self.outbox.insert(0, {
+                        "Smstat": "3", "Index": str(50000 + len(self.outbox)),
+                        "Phone": phone.text or "", "Content": request.findtext("Content") or "",
+                        "Date": request.findtext("Date") or "",
+                    })
+            return "OK"
+        if endpoint == "wlan/multi-macfilter-settings":
+            first_ssid = request.find("Ssids/Ssid")
+            macs = []
+            if first_ssid is not None and first_ssid.findtext("WifiMacFilterStatus") == "2":
+                for slot in range(MAC_FILTER_SLOTS):
+                    mac = first_ssid.findtext(f"WifiMacFilterMac{slot}")
+                    if mac:
+                        macs.append(mac.upper())
+            with self._lock:
+                self.mac_filter = macs
+            return "OK"
+        if endpoint == "qos/qos-setup":
+            mac = (request.findtext("Mac") or "").upper()
+            if not mac:
+                return ERROR_NOT_SUPPORTED
+            up = int(request.findtext("UploadRate") or 0)
+            down = int(request.findtext("DownloadRate") or 0)
+            with self._lock:
+                if request.findtext("Status") == "0" or (up, down) == (0, 0):
+                    self.qos.pop(mac, None)
+                else:
+                    self.qos[mac] = (up, down)
+            return "OK"
+        if endpoint == "device/control":
+            return "OK"
+        return ERROR_NOT_SUPPORTED
+
+    def _make_handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this,
+            # Nagle's algorithm adds ~40ms to every keep-alive request
+            disable_nagle_algorithm = True
+
+            def _session_id(self) -> Optional[str]:
+                for part in (self.headers.get("Cookie") or "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == "SessionID":
+                        return value
+                return None
+
+            def _reply(self, result):
+                if isinstance(result, int):
+                    body = f"<error><code>{result}</code><message></message></error>"
+                elif isinstance(result, str):
+                    body = f"<response>{escape(result)}</response>"
+                else:
+                    body = f"<response>{to_xml(result)}</response>"
+                data = f'<?xml version="1.0" encoding="UTF-8"?>\n{body}'.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/xml; charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("__RequestVerificationToken", secrets.token_hex(16))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _handle(self, method: str):
+                with mock._lock:
+                    mock.requests.append((time.perf_counter(), method, self.path))
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8", "replace") if length else ""
+                if mock.latency or mock.jitter:
+                    time.sleep(mock.latency + random.uniform(0, mock.jitter))
+
+                endpoint = self.path.split('?', 1)[0].removeprefix("/api/")
+                session_id = self._session_id()
+                if endpoint not in PUBLIC_ENDPOINTS and not mock._logged_in(session_id):
+                    self._reply(ERROR_WRONG_SESSION if method == "POST" else ERROR_NO_RIGHTS)
+                    return
+                if method == "GET":
+                    self._reply(mock._get(endpoint, session_id))
+                else:
+                    self._reply(mock._post(endpoint, session_id, body))
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "MockModem":
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="mock-modem", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Huawei modem API on 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--hosts", type=int, default=10, help="Connected hosts (default: 10)")
+    parser.add_argument("--sms", type=int, default=50, help="Inbox messages (default: 50)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency in ms")
+    parser.add_argument("--session-ttl", type=float, help="Expire logins after this many seconds")
+    args = parser.parse_args()
+
+    mock = MockModem(port=args.port, hosts=args.hosts, sms=args.sms,
+                     latency=args.latency / 1000, jitter=args.jitter / 1000,
+                     session_ttl=args.session_ttl)
+    print(f"Mock modem on http://{mock.host}/api (Ctrl+C to stop)")
+    try:
+        mock._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
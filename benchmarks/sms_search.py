@@ -0,0 +1,133 @@
+"""
+SMS Search Benchmark - Query latency of the SMS archive's full-text search
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Usage (from the repository root):
+    python benchmarks/sms_search.py                      # 100k messages
+    python benchmarks/sms_search.py --messages 10000 --iterations 200
+    python benchmarks/sms_search.py --max-ms 10          # exit 1 over budget
+
+Fills a temporary SmsArchive with generated messages (OTP codes, balance
+notices and chat from a fixed set of senders) and times typical searches:
+text, phone, date range and combinations, plus a linear scan of the same
+rows for comparison. With --max-ms the script exits 1 when the p95 of any
+indexed search exceeds the budget.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from suite import measure, print_table  # noqa: E402
+from modem.sms import INBOX, OUTBOX, SmsMessage  # noqa: E402
+from modem.sms_archive import SmsArchive  # noqa: E402
+
+SENDERS = ["+1555{:07d}".format(n) for n in range(200)] + ["Carrier", "MyBank", "Delivery"]
+WORDS = ("meeting tomorrow dinner tonight call me back running late see you soon "
+         "thanks ok sure where are you the train is delayed happy birthday").split()
+
+
+def make_messages(count: int, seed: int = 0) -> List[SmsMessage]:
+    """Deterministic archive content: one message a minute from 2024-01-01"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    messages = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.1:
+            phone, content = "MyBank", f"Your OTP code is {rng.randint(100000, 999999)}. Do not share it."
+        elif kind < 0.2:
+            phone, content = "Carrier", f"Your balance is {rng.uniform(0, 50):.2f} USD, valid until renewal."
+        elif kind < 0.25:
+            phone, content = "Delivery", f"Parcel {rng.randint(10**8, 10**9)} is out for delivery."
+        else:
+            phone = rng.choice(SENDERS[:200])
+            content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20)))
+        date = (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")
+        messages.append(SmsMessage(40000 + i, phone, content, date,
+                                   box=OUTBOX if kind > 0.9 else INBOX))
+    return messages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SMS archive search")
+    parser.add_argument("--messages", type=int, default=100000,
+                        help="Messages in the archive (default: 100000)")
+    parser.add_argument("--iterations", type=int, default=100, help="Runs per query (default: 100)")
+    parser.add_argument("--max-ms", type=float, help="Fail if any indexed search p95 exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    middle = messages[len(messages) // 2].date[:10]
+    last = messages[-1].date[:10]
+    queries = {
+        "text 'otp'": {"text": "otp"},
+        "text 'balance usd'": {"text": "balance usd"},
+        "text prefix 'deliv*'": {"text": "deliv*"},
+        "text 'birthday' (common)": {"text": "birthday"},
+        "phone": {"phone": SENDERS[7]},
+        "date range (1 day)": {"since": middle, "until": middle},
+        "phone + text": {"phone": "MyBank", "text": "code"},
+        "phone + text (no match)": {"phone": SENDERS[7], "text": "otp"},
+        "busy phone + rare text": {"phone": "MyBank", "text": "birthday"},
+        "text + date range": {"text": "otp", "since": middle, "until": last},
+        "no match": {"text": "zzzzzz"},
+    }
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        archive = SmsArchive(os.path.join(directory, "sms_archive.db"))
+        start = time.perf_counter()
+        archive.add(messages)
+        build = time.perf_counter() - start
+        for name, filters in queries.items():
+            results.append(measure(f"search {name}", lambda i: archive.search(**filters),
+                                   args.iterations, messages=args.messages))
+
+        # The same text query as a linear scan over every row, for reference
+        scan = [(m.phone, m.content.lower(), m.date) for m in messages]
+        results.append(measure("linear scan 'otp' (reference)", lambda i: sorted(
+            (r for r in scan if "otp" in r[1]), key=lambda r: r[2], reverse=True)[:50],
+            max(1, args.iterations // 10), messages=args.messages))
+        archive.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Archive of {args.messages} messages built in {build:.1f}s")
+        print_table(results, size_key="messages", size_label="MESSAGES")
+
+    if args.max_ms is not None:
+        slow = [r for r in results if r["name"].startswith("search") and r["p95_ms"] > args.max_ms]
+        for r in slow:
+            print(f"FAIL: {r['name']} p95 {r['p95_ms']:.2f}ms > {args.max_ms:g}ms")
+        return 1 if slow else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
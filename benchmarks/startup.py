@@ -0,0 +1,100 @@
+"""
+Startup Benchmark - Time from process start to parsed arguments and first request
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Usage (from the repository root):
+    python benchmarks/startup.py --runs 10
+    python benchmarks/startup.py --max-parse-ms 150 --max-first-request-ms 400
+
+"parse" runs `main.py --version`, which exits as soon as the arguments are
+parsed. "first request" runs the `status` subcommand against a local mock
+modem and measures until the mock receives the first HTTP request.
+With --max-* budgets the script exits 1 when a median exceeds its budget,
+so it can guard against startup regressions in CI.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from mock_modem import MockModem
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(REPO_ROOT, "main.py")
+
+
+def time_parse() -> float:
+    """Seconds from spawning main.py --version until it exits"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, MAIN, "--version"], cwd=REPO_ROOT,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def time_first_request(mock: MockModem) -> float:
+    """Seconds from spawning the status subcommand until the mock sees a request"""
+    mock.reset()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, MAIN, "-H", mock.host, "-u", "admin", "-p", "benchmark", "status"],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    process.wait(timeout=60)
+    first = mock.first_request_at()
+    if first is None:
+        raise RuntimeError("main.py exited without contacting the mock modem")
+    return first - start
+
+
+def _summary(name: str, samples) -> float:
+    ms = [s * 1000 for s in samples]
+    median = statistics.median(ms)
+    print(f"{name:<15} min {min(ms):7.1f}ms  median {median:7.1f}ms  max {max(ms):7.1f}ms")
+    return median
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure main.py startup time")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement (default: 5)")
+    parser.add_argument("--max-parse-ms", type=float, help="Fail if the median parse time exceeds this")
+    parser.add_argument("--max-first-request-ms", type=float,
+                        help="Fail if the median time to first request exceeds this")
+    args = parser.parse_args()
+
+    parse_times = [time_parse() for _ in range(args.runs)]
+    with MockModem() as mock:
+        request_times = [time_first_request(mock) for _ in range(args.runs)]
+
+    print(f"Startup over {args.runs} runs ({sys.executable})")
+    parse_median = _summary("parse", parse_times)
+    request_median = _summary("first request", request_times)
+
+    failed = False
+    if args.max_parse_ms is not None and parse_median > args.max_parse_ms:
+        print(f"FAIL: parse median {parse_median:.1f}ms > {args.max_parse_ms:g}ms")
+        failed = True
+    if args.max_first_request_ms is not None and request_median > args.max_first_request_ms:
+        print(f"FAIL: first request median {request_median:.1f}ms > {args.max_first_request_ms:g}ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
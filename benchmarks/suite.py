@@ -0,0 +1,223 @@
+"""
+Benchmark Suite - Latency and throughput of HuaweiModem operations and sync_devices
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Usage (from the repository root):
+    python benchmarks/suite.py                       # everything
+    python benchmarks/suite.py --only modem --latency 30 --concurrency 4
+    python benchmarks/suite.py --only tracker --sizes 10 1000 10000 --json
+
+"modem" runs every HuaweiModem operation against a local MockModem (needs
+huaweisms installed). "tracker" times sync_devices' work (extract_hosts,
+store sync and save) on the JSON and SQLite stores. Everything runs in a
+temporary directory, so known_devices files in the working tree are never
+touched.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from mock_modem import MockModem, make_hosts  # noqa: E402
+
+DEFAULT_SIZES = (10, 1000, 10000)
+
+
+def _stats(name: str, latencies: List[float], wall: float, **extra) -> Dict:
+    ms = sorted(s * 1000 for s in latencies)
+    return {
+        "name": name,
+        "count": len(ms),
+        "p50_ms": round(statistics.median(ms), 2),
+        "p95_ms": round(ms[min(int(len(ms) * 0.95), len(ms) - 1)], 2),
+        "max_ms": round(ms[-1], 2),
+        "ops_per_s": round(len(ms) / wall, 1) if wall else 0.0,
+        **extra,
+    }
+
+
+def measure(name: str, func: Callable[[int], object], iterations: int,
+            concurrency: int = 1, **extra) -> Dict:
+    """Call func(i) iterations times on concurrency threads; time each call and the whole run"""
+    def timed(i):
+        start = time.perf_counter()
+        func(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, range(iterations)))
+    else:
+        latencies = [timed(i) for i in range(iterations)]
+    return _stats(name, latencies, time.perf_counter() - start, **extra)
+
+
+def _check(result):
+    if not result or (isinstance(result, dict) and result.get('type') == 'error'):
+        raise RuntimeError(f"operation failed: {result}")
+    return result
+
+
+def modem_operations(modem, hosts: List[Dict]) -> Dict[str, Callable[[int], object]]:
+    """Benchmarked operations, each taking the iteration number"""
+    macs = [h["MacAddress"] for h in hosts[:10]]
+    policy = {mac: (128, 512) for mac in macs}
+    return {
+        "login": lambda i: modem.login(),
+        "get_device_info": lambda i: _check(modem.get_device_info(fresh=True)),
+        "get_status": lambda i: _check(modem.get_status(fresh=True)),
+        "get_signal": lambda i: _check(modem.get_signal(fresh=True)),
+        "get_traffic_statistics": lambda i: _check(modem.get_traffic_statistics(fresh=True)),
+        "get_connected_hosts": lambda i: _check(modem.get_connected_hosts(fresh=True)),
+        "get_sms_count": lambda i: _check(modem.get_sms_count(fresh=True)),
+        "get_sms_list(20)": lambda i: _check(modem.get_sms_list(qty=20, fresh=True)),
+        "iter_sms(all)": lambda i: sum(1 for _ in modem.iter_sms()),
+        "get_mac_filter_settings": lambda i: _check(modem.get_mac_filter_settings(fresh=True)),
+        "get_qos_settings": lambda i: _check(modem.get_qos_settings(fresh=True)),
+        "send_sms": lambda i: _check(modem.send_sms("+15550000000", f"benchmark {i}")),
+        "set_host_limit": lambda i: _check(modem.set_host_limit(macs[i % len(macs)], 64, 256)),
+        "set_host_limits(10 hosts)": lambda i: _check(modem.set_host_limits(policy)),
+        "block/unblock": lambda i: modem.update_blocked_devices(
+            block=[macs[0]] if i % 2 == 0 else (), unblock=[macs[0]] if i % 2 else ()),
+        "fetch_many(status+hosts+sms_count)": lambda i: modem.fetch_many({
+            "status": ("get_status", {"fresh": True}),
+            "hosts": ("get_connected_hosts", {"fresh": True}),
+            "sms_count": ("get_sms_count", {"fresh": True}),
+        }),
+    }
+
+
+def run_modem_benchmarks(args) -> List[Dict]:
+    from modem import HuaweiModem
+
+    results = []
+    with MockModem(hosts=args.hosts, sms=args.sms, latency=args.latency / 1000,
+                   jitter=args.jitter / 1000) as mock:
+        modem = HuaweiModem("admin", "benchmark", mock.host)
+        modem.quiet = True
+        modem.login()
+        try:
+            for name, func in modem_operations(modem, mock.hosts).items():
+                results.append(measure(name, func, args.iterations, hosts=args.hosts))
+                if args.concurrency > 1 and name.startswith("get_"):
+                    results.append(measure(f"{name} x{args.concurrency}", func, args.iterations,
+                                           concurrency=args.concurrency, hosts=args.hosts))
+        finally:
+            modem.close()
+    return results
+
+
+def _host_list(hosts: List[Dict]) -> Dict:
+    return {"type": "response", "response": {"Hosts": {"Host": hosts}}}
+
+
+def run_tracker_benchmarks(args) -> List[Dict]:
+    from modem.device_tracker import DeviceStore, extract_hosts
+    from modem.device_db import SQLiteDeviceStore
+
+    backends = {
+        "json": lambda d: DeviceStore(os.path.join(d, "known_devices.json")),
+        "sqlite": lambda d: SQLiteDeviceStore(os.path.join(d, "known_devices.db")),
+    }
+    results = []
+    for size in args.sizes:
+        hosts = make_hosts(size)
+        # The same number of devices, with a tenth swapped for new ones
+        churned = hosts[size // 10:] + make_hosts(size + size // 10)[size:]
+        responses = [_host_list(hosts), _host_list(churned)]
+
+        for backend, open_store in backends.items():
+            with tempfile.TemporaryDirectory() as directory:
+                store = open_store(directory)
+
+                def sync(response):
+                    store.sync(extract_hosts(response))
+                    store.save()
+
+                tag = {"hosts": size, "backend": backend}
+                results.append(measure(f"sync_devices first [{backend}]",
+                                       lambda i: sync(responses[0]), 1, **tag))
+                results.append(measure(f"sync_devices unchanged [{backend}]",
+                                       lambda i: sync(responses[0]), args.iterations, **tag))
+                results.append(measure(f"sync_devices 10% churn [{backend}]",
+                                       lambda i: sync(responses[(i + 1) % 2]), args.iterations, **tag))
+                store.flush()
+                if backend == "sqlite":
+                    store.close()
+                results.append(measure(f"load store [{backend}]",
+                                       lambda i: open_store(directory), 1, **tag))
+    return results
+
+
+def print_table(results: List[Dict], size_key: str = "hosts", size_label: str = "HOSTS"):
+    """Print results as a table; size_key is the field shown in the size_label column"""
+    width = max(len(r["name"]) for r in results)
+    size_width = max([6, len(size_label)] + [len(str(r.get(size_key, ''))) for r in results])
+    print(f"{'BENCHMARK':<{width}}  {size_label:>{size_width}}  {'N':>5}  "
+          f"{'P50':>10}  {'P95':>10}  {'MAX':>10}  {'OPS/S':>9}")
+    for r in results:
+        print(f"{r['name']:<{width}}  {r.get(size_key, ''):>{size_width}}  {r['count']:>5}  "
+              f"{r['p50_ms']:>8.2f}ms  {r['p95_ms']:>8.2f}ms  {r['max_ms']:>8.2f}ms  {r['ops_per_s']:>9.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark HuaweiModem against a local mock modem")
+    parser.add_argument("--only", choices=("modem", "tracker"), help="Run only one group")
+    parser.add_argument("--iterations", type=int, default=20, help="Calls per benchmark (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Also run each read with this many threads (default: 1 = off)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock modem latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Mock modem random extra latency in ms")
+    parser.add_argument("--hosts", type=int, default=10, help="Hosts on the mock modem (default: 10)")
+    parser.add_argument("--sms", type=int, default=200, help="Messages on the mock modem (default: 200)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Host counts for the tracker benchmarks (default: 10 1000 10000)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # Operations such as block/unblock update the device tracker in the cwd
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            if args.only in (None, "modem"):
+                results += run_modem_benchmarks(args)
+            if args.only in (None, "tracker"):
+                results += run_tracker_benchmarks(args)
+        finally:
+            os.chdir(cwd)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
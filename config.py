@@ -17,11 +17,106 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+import os
+
 # Default configuration
 MODEM_USER = "admin"
 MODEM_PASS = None  # Password must be provided via command line for security
 MODEM_HOST = "192.168.8.1"
 
+# Maximum number of read requests sent to the modem in parallel
+FETCH_MAX_WORKERS = 4
+
+# Keep-alive HTTP transport (connection pool size and timeouts in seconds)
+TRANSPORT_POOL_SIZE = 4
+TRANSPORT_CONNECT_TIMEOUT = 5.0
+TRANSPORT_READ_TIMEOUT = 15.0
+
+# Request retries: reads are retried with jittered backoff (seconds) until the
+# per-call budget is spent; the circuit opens after consecutive failures
+REQUEST_RETRY_BUDGET = 10.0
+REQUEST_RETRY_BASE_DELAY = 0.25
+REQUEST_RETRY_MAX_DELAY = 2.0
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30.0
+
+# Opt-in session cache (--session-cache): location and lifetime in seconds
+SESSION_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "huawei-connect")
+SESSION_CACHE_TTL = 300
+
+# Response cache: seconds each endpoint's response stays fresh, and max entries
+CACHE_TTLS = {
+    "device_info": 300,
+    "status": 5,
+    "hosts": 5,
+    "sms": 10,
+    "sms_count": 10,
+    "signal": 5,
+    "traffic": 5,
+    "mac_filter": 10,
+    "qos": 10,
+}
+CACHE_MAX_ENTRIES = 64
+
+# Known devices storage: "json" (known_devices.json) or "sqlite" (known_devices.db)
+DEVICE_STORE_BACKEND = "json"
+
+# The JSON backend appends changes to known_devices.log and folds the log
+# into a fresh known_devices.json snapshot once it reaches this size
+DEVICE_LOG_COMPACT_BYTES = 256 * 1024
+
+# Syncs that only refresh last_seen timestamps are written at most this
+# often (seconds); pending timestamps are always flushed at exit
+TRACKER_FLUSH_INTERVAL = 60
+
+# Fleet mode: modems handled in parallel and overall deadline in seconds
+FLEET_MAX_WORKERS = 8
+FLEET_TIMEOUT = 60
+
+# Polling daemon: seconds between polls after a change, ceiling when idle,
+# and growth factor applied to the interval on every quiet cycle
+DAEMON_MIN_INTERVAL = 10
+DAEMON_MAX_INTERVAL = 300
+DAEMON_BACKOFF = 1.5
+
+# Status time series kept by the daemon (--timeseries DIR): samples per
+# modem (17280 = 24h at one sample every 5s) and the numeric fields stored
+TIMESERIES_CAPACITY = 17280
+TIMESERIES_FIELDS = (
+    "SignalIcon", "rsrp", "rsrq", "rssi", "sinr",
+    "CurrentDownloadRate", "CurrentUploadRate",
+)
+
+# Metrics exporter: listen address, port and modem refresh interval (seconds)
+EXPORTER_BIND = "127.0.0.1"
+EXPORTER_PORT = 9723
+EXPORTER_REFRESH_INTERVAL = 15
+
+# Messages requested per sms/sms-list page when iterating over a whole box
+SMS_PAGE_SIZE = 20
+
+# Local SQLite archive filled by incremental SMS syncs
+SMS_ARCHIVE_FILE = "sms_archive.db"
+
+# Most messages returned by one archive search
+SMS_SEARCH_LIMIT = 50
+
+# Bulk SMS send queue: messages per minute, burst size, attempts per
+# message and base delay (seconds) before retrying a failed send
+SMS_QUEUE_FILE = "sms_queue.db"
+SMS_SEND_RATE = 10
+SMS_SEND_BURST = 1
+SMS_SEND_MAX_ATTEMPTS = 3
+SMS_SEND_RETRY_DELAY = 30
+
+# Re-queueing a message (same number and text, or same key) that was sent
+# less than this many seconds ago is skipped as a duplicate
+SMS_QUEUE_DEDUPE_WINDOW = 6 * 3600
+
+# Screen output is buffered and written once, or in chunks of this many
+# characters for very large screens
+RENDER_CHUNK_SIZE = 64 * 1024
+
 # Menu options
 MENU_OPTIONS = {
     1: "Device Information",
@@ -36,5 +131,7 @@ MENU_OPTIONS = {
     10: "View Blocked Devices",
     11: "Block a Device",
     12: "Unblock a Device",
+    13: "Sync SMS Archive",
+    14: "Search SMS Archive",
     0: "Exit"
 }
\ No newline at end of file
@@ -18,17 +18,21 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 import argparse
+import atexit
+import shlex
+import sys
+import time
 from modem import HuaweiModem
-from modem.menu import show_menu, get_user_choice, get_continue_choice
-from modem.display import (
-    display_device_info, display_connection_status,
-    display_connected_hosts, display_recent_sms,
-    send_sms_message, reboot_modem,
-    display_bandwidth_control, show_all_information,
-    display_disconnected_devices, display_blocked_devices,
-    display_block_device_menu, display_unblock_device_menu
+from modem.profiling import get_recorder
+from modem.fleet import FLEET_OPERATIONS, load_inventory, run_fleet, print_fleet_results
+from modem.batch import BATCH_OPERATIONS, read_operations, run_operations, print_json_lines
+from utils.colors import Colors
+from config import (
+    MODEM_USER, MODEM_PASS, MODEM_HOST, FLEET_MAX_WORKERS, FLEET_TIMEOUT,
+    DAEMON_MIN_INTERVAL, DAEMON_MAX_INTERVAL,
+    EXPORTER_BIND, EXPORTER_PORT, EXPORTER_REFRESH_INTERVAL,
+    SMS_SEND_RATE, SMS_SEND_BURST, SMS_SEND_MAX_ATTEMPTS
 )
-from config import MODEM_USER, MODEM_PASS, MODEM_HOST
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -40,6 +44,13 @@ Examples:
   python main.py --user admin --password mypassword
   python main.py --host 192.168.8.1 --user admin --password mypassword
   python main.py -u admin -p mypassword -h 192.168.8.1
+  python main.py fleet inventory.json --op status
+  python main.py -p mypassword daemon --min-interval 10 --max-interval 300
+  python main.py -p mypassword exporter --port 9723
+  python main.py -p mypassword hosts
+  python main.py -p mypassword batch operations.txt
+  python main.py -p mypassword sms-queue recipients.csv --rate 20
+  python main.py -p mypassword --profile status
         '''
     )
     
@@ -47,31 +58,254 @@ Examples:
                         help='Modem username (default: admin)',
                         default=MODEM_USER)
     parser.add_argument('-p', '--password',
-                        help='Modem password (required)',
-                        required=True)
+                        help='Modem password (required except in fleet mode)')
     parser.add_argument('-H', '--host',
                         help='Modem host/IP address (default: 192.168.8.1)',
                         default=MODEM_HOST)
+    parser.add_argument('--session-cache', action='store_true',
+                        help='Reuse a cached login session between runs')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print request latency per endpoint (count, p50, p95, max) at exit')
     parser.add_argument('--version', action='version',
                         version='%(prog)s 1.0.0',
                         help='Show version information')
-    
-    return parser.parse_args()
+
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    fleet_parser = subparsers.add_parser(
+        'fleet', help='Run a read operation on many modems in parallel'
+    )
+    fleet_parser.add_argument('inventory',
+                              help='JSON file listing host, user and password of each modem')
+    fleet_parser.add_argument('--op', choices=sorted(FLEET_OPERATIONS), default='status',
+                              help='Operation to run on every modem (default: status)')
+    fleet_parser.add_argument('--json', action='store_true',
+                              help='Print results as one JSON document')
+    fleet_parser.add_argument('--workers', type=int, default=FLEET_MAX_WORKERS,
+                              help=f'Modems handled in parallel (default: {FLEET_MAX_WORKERS})')
+    fleet_parser.add_argument('--timeout', type=float, default=FLEET_TIMEOUT,
+                              help=f'Overall deadline in seconds (default: {FLEET_TIMEOUT})')
+
+    daemon_parser = subparsers.add_parser(
+        'daemon', help='Poll connected hosts and status in the background'
+    )
+    daemon_parser.add_argument('--min-interval', type=float, default=DAEMON_MIN_INTERVAL,
+                               help=f'Seconds between polls after a change (default: {DAEMON_MIN_INTERVAL})')
+    daemon_parser.add_argument('--max-interval', type=float, default=DAEMON_MAX_INTERVAL,
+                               help=f'Longest wait between polls when idle (default: {DAEMON_MAX_INTERVAL})')
+    daemon_parser.add_argument('--timeseries', metavar='DIR',
+                               help='Record signal and throughput samples into ring buffers in DIR')
+
+    exporter_parser = subparsers.add_parser(
+        'exporter', help='Serve Prometheus metrics on /metrics'
+    )
+    exporter_parser.add_argument('--bind', default=EXPORTER_BIND,
+                                 help=f'Address to listen on (default: {EXPORTER_BIND})')
+    exporter_parser.add_argument('--port', type=int, default=EXPORTER_PORT,
+                                 help=f'Port to listen on (default: {EXPORTER_PORT})')
+    exporter_parser.add_argument('--interval', type=float, default=EXPORTER_REFRESH_INTERVAL,
+                                 help=f'Seconds between modem refreshes (default: {EXPORTER_REFRESH_INTERVAL})')
+
+    for op, (arg_names, _, _, op_help) in BATCH_OPERATIONS.items():
+        op_parser = subparsers.add_parser(op, help=f'{op_help} (JSON output)')
+        for name in arg_names:
+            op_parser.add_argument(name)
+
+    queue_parser = subparsers.add_parser(
+        'sms-queue', help='Send queued SMS at a limited rate (JSON report)'
+    )
+    queue_parser.add_argument('file', nargs='?',
+                              help='CSV of NUMBER,TEXT[,KEY] rows to queue; omit to resume the queue')
+    queue_parser.add_argument('--rate', type=float, default=SMS_SEND_RATE,
+                              help=f'Messages per minute (default: {SMS_SEND_RATE})')
+    queue_parser.add_argument('--burst', type=int, default=SMS_SEND_BURST,
+                              help=f'Messages sent back to back after a pause (default: {SMS_SEND_BURST})')
+    queue_parser.add_argument('--attempts', type=int, default=SMS_SEND_MAX_ATTEMPTS,
+                              help=f'Attempts per message (default: {SMS_SEND_MAX_ATTEMPTS})')
+    queue_parser.add_argument('--retry-failed', action='store_true',
+                              help='Queue messages that failed in earlier runs again')
+    queue_parser.add_argument('--resend', action='store_true',
+                              help='Send messages of the file again even if they were sent recently')
+
+    batch_parser = subparsers.add_parser(
+        'batch', help='Run operations from a file or stdin (JSON lines output)'
+    )
+    batch_parser.add_argument('file', nargs='?', default='-',
+                              help="File with one operation per line, or '-' for stdin")
+
+    args = parser.parse_args()
+    if args.command != 'fleet' and not args.password:
+        parser.error('the following arguments are required: -p/--password')
+    if args.command == 'sms-queue':
+        if args.rate <= 0:
+            parser.error('--rate must be greater than 0')
+        if args.burst < 1 or args.attempts < 1:
+            parser.error('--burst and --attempts must be at least 1')
+    return args
+
+def run_fleet_mode(args):
+    """Run one read operation across every modem in the inventory"""
+    try:
+        inventory = load_inventory(args.inventory)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.FAIL}❌ Could not load inventory: {e}{Colors.ENDC}")
+        return
+
+    results = run_fleet(inventory, args.op, max_workers=args.workers, timeout=args.timeout)
+    print_fleet_results(results, args.op, as_json=args.json)
+
+def run_batch_mode(args):
+    """
+    Run a single operation subcommand or a batch file on one login,
+    printing one JSON line per operation. Returns the process exit code.
+    """
+    if args.command == 'batch':
+        try:
+            if args.file == '-':
+                operations = read_operations(sys.stdin)
+            else:
+                with open(args.file, 'r') as f:
+                    operations = read_operations(f)
+        except OSError as e:
+            print_json_lines([{"op": "batch", "args": [args.file], "ok": False,
+                               "elapsed_ms": 0.0, "error": str(e)}])
+            return 1
+    else:
+        arg_names = BATCH_OPERATIONS[args.command][0]
+        line = shlex.join([args.command] + [getattr(args, name) for name in arg_names])
+        operations = read_operations([line])
+
+    modem = HuaweiModem(args.user, args.password, args.host,
+                        session_cache=args.session_cache)
+    modem.quiet = True
+    start = time.perf_counter()
+    try:
+        modem.login()
+    except Exception as e:
+        print_json_lines([{"op": "login", "args": [], "ok": False,
+                           "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+                           "error": str(e)}])
+        modem.close()
+        return 1
+
+    try:
+        all_ok = print_json_lines(run_operations(modem, operations))
+    finally:
+        modem.close()
+    return 0 if all_ok else 1
+
+def run_sms_queue(args):
+    """
+    Queue the jobs of a CSV file and send every pending job, printing
+    progress to stderr and a JSON report line. Returns the exit code.
+    """
+    from modem.sms_queue import get_queue
+
+    queue = get_queue()
+    start = time.perf_counter()
+
+    def report(ok, result=None, error=None):
+        outcome = {"op": "sms-queue", "args": [args.file] if args.file else [], "ok": ok,
+                   "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
+        outcome.update({"result": result} if error is None else {"error": error})
+        print_json_lines([outcome])
+        return 0 if ok else 1
+
+    try:
+        added = queue.add_csv(args.file, resend=args.resend) if args.file else {}
+    except (OSError, UnicodeDecodeError) as e:
+        return report(False, error=str(e))
+    for error in added.get("errors", ()):
+        print(f"{Colors.WARNING}Skipped {error}{Colors.ENDC}", file=sys.stderr)
+    if args.retry_failed:
+        queue.retry_failed()
+
+    modem = HuaweiModem(args.user, args.password, args.host,
+                        session_cache=args.session_cache)
+    modem.quiet = True
+    try:
+        modem.login()
+    except Exception as e:
+        modem.close()
+        return report(False, error=f"login failed: {e}")
+
+    def progress(phone, state, error):
+        suffix = f": {error}" if error else ""
+        print(f"{state:<8} {phone}{suffix}", file=sys.stderr, flush=True)
+
+    try:
+        result = queue.run(modem, rate=args.rate, burst=args.burst,
+                           max_attempts=args.attempts, on_result=progress)
+    except KeyboardInterrupt:
+        # Unsent jobs stay queued; running the command again resumes them
+        result = dict(queue.report.as_dict() if queue.report else {},
+                      queue=queue.counts(), interrupted=True)
+    finally:
+        modem.close()
+    result["queued"] = added
+    return report(result.get("failed", 0) == 0 and not result.get("interrupted"), result)
+
+def print_profile():
+    """Print the latency summary of every modem request to stderr"""
+    print(f"\n{Colors.HEADER}{Colors.BOLD}  Request Latency  {Colors.ENDC}", file=sys.stderr)
+    print(get_recorder().format_summary(), file=sys.stderr)
 
 def main():
     """Main application entry point"""
     
     # Parse command line arguments
     args = parse_arguments()
+    if args.profile:
+        atexit.register(print_profile)
+
+    if args.command == 'fleet':
+        run_fleet_mode(args)
+        return
+
+    if args.command == 'batch' or args.command in BATCH_OPERATIONS:
+        return run_batch_mode(args)
+
+    if args.command == 'sms-queue':
+        return run_sms_queue(args)
     
     # Create modem instance with configuration
-    modem = HuaweiModem(args.user, args.password, args.host)
+    modem = HuaweiModem(args.user, args.password, args.host,
+                        session_cache=args.session_cache)
     
     # Connect to modem
     if not modem.connect():
         modem._print_error("Failed to initialize modem connection")
         return
     
+    # Mode-specific modules are imported only when that mode runs, which
+    # keeps --help, --version and scripted subcommands fast to start
+    if args.command == 'daemon':
+        import logging
+        from modem.daemon import PollingDaemon
+        logging.basicConfig(level=logging.INFO,
+                            format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+        PollingDaemon(modem, min_interval=args.min_interval,
+                      max_interval=args.max_interval,
+                      timeseries_dir=args.timeseries).run()
+        return
+
+    if args.command == 'exporter':
+        from modem.exporter import serve_metrics
+        modem._print_info(f"Serving metrics on http://{args.bind}:{args.port}/metrics")
+        serve_metrics(modem, port=args.port, bind=args.bind, interval=args.interval)
+        return
+
+    from modem.menu import show_menu, get_user_choice, get_continue_choice
+    from modem.display import (
+        display_device_info, display_connection_status,
+        display_connected_hosts, display_recent_sms,
+        send_sms_message, reboot_modem,
+        display_bandwidth_control, show_all_information,
+        display_disconnected_devices, display_blocked_devices,
+        display_block_device_menu, display_unblock_device_menu,
+        display_sms_archive_sync, display_sms_search
+    )
+
     # Show success message
     modem._print_success("Authenticated Successfully")
     
@@ -121,10 +355,18 @@ def main():
         elif choice == 12:  # Unblock a Device
             display_unblock_device_menu(modem)
 
+        elif choice == 13:  # Sync SMS Archive
+            display_sms_archive_sync(modem)
+
+        elif choice == 14:  # Search SMS Archive
+            display_sms_search(modem)
+
         # Ask if user wants to continue
         if get_continue_choice():
             modem._print_info("Goodbye!")
             break
 
+    modem.close()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
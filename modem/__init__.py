@@ -17,85 +17,475 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
-import huaweisms.api.user
-import huaweisms.api.wlan
-import huaweisms.api.sms
-import huaweisms.api.device
-import huaweisms.api.monitoring
-import huaweisms.api.common
-from utils.colors import Colors
+import threading
+import time
+from contextlib import contextmanager
+from utils.render import Renderer
+from config import (
+    FETCH_MAX_WORKERS, TRANSPORT_POOL_SIZE,
+    TRANSPORT_CONNECT_TIMEOUT, TRANSPORT_READ_TIMEOUT,
+    CACHE_TTLS, CACHE_MAX_ENTRIES,
+    REQUEST_RETRY_BUDGET, REQUEST_RETRY_BASE_DELAY, REQUEST_RETRY_MAX_DELAY,
+    SMS_PAGE_SIZE, SMS_SEARCH_LIMIT, SMS_SEND_RATE
+)
+from modem.cache import TTLCache
+from modem.fetch import fetch_concurrently
+from modem.session_cache import load_session, save_session, clear_session
+from modem.qos import parse_qos_limits, diff_limits
+from modem.mac_filter import MacFilterManager, parse_blocked_macs
+from modem.sms import INBOX, iter_messages
+from modem.profiling import get_recorder
+from modem.resilience import (
+    CircuitBreaker, CircuitOpenError, is_session_error, is_transient_error, backoff_delay
+)
 from modem.device_tracker import (
-    sync_devices, get_disconnected_devices, get_known_devices,
+    normalize_mac, sync_devices, get_disconnected_devices, get_known_devices,
     set_device_blocked, get_blocked_devices, is_device_known
 )
 
 class HuaweiModem:
-    def __init__(self, username="admin", password="password", modem_host="192.168.8.1"):
+    # Read-only methods that can safely share the session concurrently
+    READ_METHODS = (
+        "get_device_info", "get_status", "get_connected_hosts",
+        "get_sms_list", "get_sms_count", "get_signal", "get_traffic_statistics"
+    )
+
+    def __init__(self, username="admin", password="password", modem_host="192.168.8.1",
+                 pool_size=TRANSPORT_POOL_SIZE, connect_timeout=TRANSPORT_CONNECT_TIMEOUT,
+                 read_timeout=TRANSPORT_READ_TIMEOUT, session_cache=False, recorder=None):
         self.username = username
         self.password = password
         self.modem_host = modem_host
+        self.session_cache = session_cache
+        # When True, status messages are suppressed (machine-readable output)
+        self.quiet = False
+        # Active screen buffer of the _print_* helpers (see screen())
+        self._renderer = None
         self.ctx = None
+        # Latency histograms of every request (shared process-wide by default)
+        self.recorder = recorder or get_recorder()
+        # The HTTP stack is only imported and set up on first use
+        self._transport = None
+        self._transport_options = {
+            "pool_size": pool_size,
+            "connect_timeout": connect_timeout,
+            "read_timeout": read_timeout,
+        }
+        self.cache = TTLCache(maxsize=CACHE_MAX_ENTRIES)
+        self.retry_budget = REQUEST_RETRY_BUDGET
+        self.breaker = CircuitBreaker()
+        self._login_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._transport_lock = threading.Lock()
+        self.retries = 0
+        self.relogins = 0
+
+    @property
+    def transport(self):
+        """Pooled HTTP transport, created on first access."""
+        if self._transport is None:
+            # fetch_many() threads may get here together; create only one pool
+            with self._transport_lock:
+                if self._transport is None:
+                    from modem.transport import ModemTransport
+                    self._transport = ModemTransport(self.modem_host, recorder=self.recorder,
+                                                     **self._transport_options)
+        return self._transport
 
     def connect(self):
-        """Authenticates with the modem."""
+        """
+        Authenticates with the modem.
+        With session_cache enabled, a cached session is reused when the modem
+        still accepts it and a full login is only done otherwise.
+        """
+        try:
+            self.login()
+            return True
+        except Exception as e:
+            self._print_error(f"Connection failed: {e}")
+            return False
+
+    def login(self):
+        """Authenticates with the modem, raising on failure (see connect())."""
+        if self.session_cache and self._restore_session():
+            return
+        self._full_login()
+
+    def _full_login(self):
+        """Logs in with username and password, bypassing the session cache."""
+        import huaweisms.api.user
+        # quick_login runs on huaweisms' own HTTP session, so time it here
+        start = time.perf_counter()
+        outcome = "ok"
         try:
             self.ctx = huaweisms.api.user.quick_login(
                 self.username, 
                 self.password, 
                 modem_host=self.modem_host
             )
-            return True
         except Exception as e:
-            self._print_error(f"Connection failed: {e}")
+            outcome = e.__class__.__name__
+            raise
+        finally:
+            self.recorder.record("user/login", time.perf_counter() - start, outcome=outcome)
+        if self.session_cache:
+            save_session(self.ctx, self.modem_host, self.username)
+
+    def _restore_session(self):
+        """Loads a cached session and checks it with one cheap call."""
+        ctx = load_session(self.modem_host, self.username)
+        if not ctx:
+            return False
+
+        try:
+            state = self.transport.get(ctx, "user/state-login")
+            if state.get('type') != 'response' or str(state['response'].get('State')) != '0':
+                clear_session(self.modem_host, self.username)
+                return False
+
+            if not ctx.tokens:
+                # Writes need a verification token; top up from the web server
+                tok_info = self.transport.get(ctx, "webserver/SesTokInfo")
+                token = tok_info.get('response', {}).get('TokInfo')
+                if token:
+                    ctx.tokens.append(token)
+        except Exception:
+            clear_session(self.modem_host, self.username)
             return False
 
-    def get_connected_hosts(self):
+        self.ctx = ctx
+        return True
+
+    def close(self):
+        """Releases pooled connections to the modem and refreshes the session cache."""
+        if self.session_cache and self.ctx:
+            save_session(self.ctx, self.modem_host, self.username)
+        if self._transport is not None:
+            self._transport.close()
+
+    def _relogin(self, stale_ctx):
+        """
+        Replaces an expired session. Concurrent callers that saw the same
+        stale session wait for a single login instead of each logging in.
+        """
+        with self._login_lock:
+            if self.ctx is not stale_ctx:
+                return
+            if self.session_cache:
+                clear_session(self.modem_host, self.username)
+            self._full_login()
+            with self._stats_lock:
+                self.relogins += 1
+
+    def _request(self, method, endpoint, xml_data=None, idempotent=None):
+        """
+        Sends one API request. Every API call goes through here.
+        An expired session or token triggers one re-login and a resend.
+        Idempotent requests (GETs unless stated otherwise) are retried with
+        jittered backoff on connection errors and transient firmware errors
+        until retry_budget seconds have passed. Raises CircuitOpenError
+        without contacting the modem while the circuit breaker is open.
+        """
+        if idempotent is None:
+            idempotent = method == "GET"
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                f"Modem unavailable after repeated failures, "
+                f"retrying in {self.breaker.retry_after():.0f}s"
+            )
+
+        deadline = time.monotonic() + self.retry_budget
+        relogged = False
+        attempt = 0
+        while True:
+            ctx = self.ctx
+            error = None
+            try:
+                if method == "GET":
+                    result = self.transport.get(ctx, endpoint)
+                else:
+                    result = self.transport.post(ctx, endpoint, xml_data)
+            except OSError as e:  # requests' connection errors and timeouts
+                result, error = None, e
+            except Exception:
+                self.breaker.record_failure()
+                raise
+
+            if error is None and is_session_error(result) and not relogged:
+                relogged = True
+                try:
+                    self._relogin(ctx)
+                except Exception:
+                    self.breaker.record_failure()
+                    raise
+                continue
+            if error is None and not is_transient_error(result):
+                self.breaker.record_success()
+                return result
+
+            self.breaker.record_failure()
+            delay = backoff_delay(attempt, REQUEST_RETRY_BASE_DELAY, REQUEST_RETRY_MAX_DELAY)
+            if (not idempotent or time.monotonic() + delay > deadline
+                    or self.breaker.state != CircuitBreaker.CLOSED):
+                if error is not None:
+                    raise error
+                return result
+            attempt += 1
+            with self._stats_lock:
+                self.retries += 1
+            time.sleep(delay)
+
+    def get_resilience_stats(self):
+        """Returns retry and re-login counts and the circuit breaker state."""
+        with self._stats_lock:
+            stats = {"retries": self.retries, "relogins": self.relogins}
+        stats.update(self.breaker.as_dict())
+        return stats
+
+    def get_latency_stats(self):
+        """
+        Returns per-endpoint latency statistics of the requests made so far:
+        {endpoint: {"count", "errors", "mean_ms", "p50_ms", "p95_ms", "max_ms",
+        "bytes_out", "bytes_in", "outcomes"}}
+        """
+        return self.recorder.summary()
+
+    def get_transport_stats(self):
+        """Returns request counts and how many used new vs reused connections."""
+        return self.transport.stats.as_dict()
+
+    def _cached(self, endpoint, fetch, fresh=False, key=()):
+        """
+        Returns a cached response for endpoint, calling fetch() on a miss.
+        Error responses are never cached. fresh=True bypasses the cache
+        and stores the new result.
+        """
+        cache_key = (endpoint,) + tuple(key)
+        if not fresh:
+            hit, value = self.cache.get(cache_key)
+            if hit:
+                return value
+
+        value = fetch()
+        if value and value.get('type') != 'error':
+            self.cache.set(cache_key, value, CACHE_TTLS.get(endpoint, 0))
+        return value
+
+    def invalidate_cache(self, *endpoints):
+        """Drops cached responses for the given endpoints, or everything if none given."""
+        if endpoints:
+            self.cache.invalidate(*endpoints)
+        else:
+            self.cache.clear()
+
+    def get_connected_hosts(self, fresh=False):
         """Returns a list of connected devices."""
         if not self.ctx:
             return None
-        return huaweisms.api.wlan.get_connected_hosts(self.ctx)
+        return self._cached(
+            "hosts", lambda: self._request("GET", "wlan/host-list"), fresh
+        )
 
-    def get_device_info(self):
+    def get_device_info(self, fresh=False):
         """Returns hardware and software information about the modem."""
         if not self.ctx:
             return None
-        return huaweisms.api.device.information(self.ctx)
+        return self._cached(
+            "device_info", lambda: self._request("GET", "device/information"), fresh
+        )
 
-    def get_status(self):
+    def get_status(self, fresh=False):
         """Returns monitoring status (signal, network type, etc.)."""
         if not self.ctx:
             return None
-        return huaweisms.api.monitoring.status(self.ctx)
+        return self._cached(
+            "status", lambda: self._request("GET", "monitoring/status"), fresh
+        )
+
+    def get_signal(self, fresh=False):
+        """Returns radio signal details (RSRP, RSRQ, RSSI, SINR, etc.)."""
+        if not self.ctx:
+            return None
+        return self._cached(
+            "signal", lambda: self._request("GET", "device/signal"), fresh
+        )
+
+    def get_traffic_statistics(self, fresh=False):
+        """Returns traffic counters and current upload/download rates."""
+        if not self.ctx:
+            return None
+        return self._cached(
+            "traffic", lambda: self._request("GET", "monitoring/traffic-statistics"), fresh
+        )
+
+    def get_sms_count(self, fresh=False):
+        """Returns SMS counters (inbox, outbox, unread, etc.)."""
+        if not self.ctx:
+            return None
+        return self._cached(
+            "sms_count", lambda: self._request("GET", "sms/sms-count"), fresh
+        )
 
-    def get_sms_list(self, qty=10):
-        """Returns the latest SMS messages."""
+    def _fetch_sms_page(self, page, qty, box_type):
+        """Requests one page of an SMS box, newest first, without caching."""
+        xml_data = """<?xml version="1.0" encoding="UTF-8"?>
+        <request>
+            <PageIndex>{}</PageIndex>
+            <ReadCount>{}</ReadCount>
+            <BoxType>{}</BoxType>
+            <SortType>0</SortType>
+            <Ascending>0</Ascending>
+            <UnreadPreferred>0</UnreadPreferred>
+        </request>""".format(page, qty, box_type)
+        return self._request("POST", "sms/sms-list", xml_data, idempotent=True)
+
+    def get_sms_list(self, qty=10, box_type=1, page=1, fresh=False):
+        """Returns the latest SMS messages (box_type 1 = inbox, 2 = outbox)."""
         if not self.ctx:
             return None
-        return huaweisms.api.sms.get_sms(self.ctx, qty=qty)
+        return self._cached(
+            "sms", lambda: self._fetch_sms_page(page, qty, box_type),
+            fresh, key=(qty, box_type, page)
+        )
+
+    def iter_sms(self, box_types=(INBOX,), page_size=SMS_PAGE_SIZE, read_state=None,
+                 limit=None, stop=None):
+        """
+        Yields SmsMessage objects newest first, fetching one page at a time.
+        Args:
+            box_types: boxes to read in order (modem.sms.INBOX, OUTBOX)
+            page_size: messages per request
+            read_state: "unread", "read" or None for all
+            limit: maximum number of messages to yield
+            stop: callable; iteration ends at the first message it returns True for
+        Stopping the generator early skips the remaining page requests.
+        """
+        if not self.ctx:
+            return iter(())
+        return iter_messages(self._fetch_sms_page, box_types=box_types, page_size=page_size,
+                             read_state=read_state, limit=limit, stop=stop)
+
+    def sync_sms(self, archive=None):
+        """
+        Archives SMS messages received or sent since the last sync.
+        Returns {box name: number of new messages}; uses the local archive
+        from modem.sms_archive unless another SmsArchive is given.
+        """
+        if not self.ctx:
+            return None
+        if archive is None:
+            from modem.sms_archive import get_archive
+            archive = get_archive()
+        return archive.sync(self)
+
+    def search_sms(self, query="", phone=None, since=None, until=None,
+                   limit=SMS_SEARCH_LIMIT, archive=None):
+        """
+        Searches the local SMS archive (see sync_sms) and returns matching
+        messages as dicts, newest first. The query may hold from:NUMBER,
+        since:DATE and until:DATE filters next to the words to match.
+        """
+        from modem.sms_archive import get_archive, parse_search
+        filters = parse_search(query)
+        archive = archive or get_archive()
+        messages = archive.search(filters["text"], phone=phone or filters["phone"],
+                                  since=since or filters["since"],
+                                  until=until or filters["until"], limit=limit)
+        return [message.as_dict() for message in messages]
+
+    def get_mac_filter_settings(self, fresh=False):
+        """Returns the raw WLAN MAC filter settings."""
+        if not self.ctx:
+            return None
+        return self._cached(
+            "mac_filter",
+            lambda: self._request("GET", "wlan/multi-macfilter-settings"),
+            fresh
+        )
+
+    def get_qos_settings(self, fresh=False):
+        """Returns the per-host bandwidth limits (QoS) configuration."""
+        if not self.ctx:
+            return None
+        return self._cached(
+            "qos", lambda: self._request("GET", "qos/qos-setup"), fresh
+        )
+
+    def fetch_many(self, calls, max_workers=FETCH_MAX_WORKERS):
+        """
+        Fetch several independent read endpoints in parallel on the shared session.
+        Args:
+            calls: dict mapping a result name to a read method name, or to a
+                   (method name, kwargs) tuple, e.g.
+                   {"status": "get_status", "sms": ("get_sms_list", {"qty": 5})}
+            max_workers: maximum number of requests in flight
+        Returns:
+            dict of name -> FetchResult in the same order as calls
+        """
+        bound_calls = {}
+        for name, spec in calls.items():
+            method_name, kwargs = spec if isinstance(spec, tuple) else (spec, {})
+            if method_name not in self.READ_METHODS:
+                raise ValueError(f"{method_name} is not a read method")
+            method = getattr(self, method_name)
+            bound_calls[name] = lambda method=method, kwargs=kwargs: method(**kwargs)
+        return fetch_concurrently(bound_calls, max_workers=max_workers)
 
     def send_sms(self, phone_number, message):
         """Sends an SMS message."""
         if not self.ctx:
             return None
-        return huaweisms.api.sms.send_sms(self.ctx, phone_number, message)
+        from xml.sax.saxutils import escape
+        xml_data = """<?xml version="1.0" encoding="UTF-8"?>
+        <request>
+            <Index>-1</Index>
+            <Phones><Phone>{}</Phone></Phones>
+            <Sca></Sca>
+            <Content>{}</Content>
+            <Length>{}</Length>
+            <Reserved>1</Reserved>
+            <Date>{}</Date>
+        </request>""".format(
+            escape(phone_number), escape(message), len(message),
+            time.strftime("%Y-%m-%d %H:%M:%S")
+        )
+        self.invalidate_cache("sms", "sms_count")
+        return self._request("POST", "sms/send-sms", xml_data)
+
+    def send_sms_bulk(self, jobs=(), rate=SMS_SEND_RATE, queue=None, on_result=None,
+                      resend=False):
+        """
+        Queues (number, text[, key]) jobs in the persistent send queue and
+        sends everything pending at rate messages per minute.
+        Jobs still queued or sent within SMS_QUEUE_DEDUPE_WINDOW are
+        skipped, so the same batch can be submitted again after an
+        interruption; resend=True sends them again anyway.
+        Returns the run's report.
+        """
+        if not self.ctx:
+            return None
+        if queue is None:
+            from modem.sms_queue import get_queue
+            queue = get_queue()
+        queue.add(jobs, resend=resend)
+        return queue.run(self, rate=rate, on_result=on_result)
 
     def reboot(self):
         """Reboots the modem."""
         if not self.ctx:
             return None
-        return huaweisms.api.device.reboot(self.ctx)
+        xml_data = """<?xml version="1.0" encoding="UTF-8"?>
+        <request>
+            <Control>1</Control>
+        </request>"""
+        self.invalidate_cache()
+        return self._request("POST", "device/control", xml_data)
 
     def _send_custom_xml(self, endpoint, xml_data):
         """Sends a custom XML payload to a specified endpoint."""
         if not self.ctx:
             return None
-        url = "{}/{}.".format(self.ctx.api_base_url, endpoint.lstrip('/'))
-        headers = {
-            "__RequestVerificationToken": self.ctx.token,
-        }
-        return huaweisms.api.common.post_to_url(
-            url, xml_data, self.ctx, additional_headers=headers
-        )
+        return self._request("POST", endpoint, xml_data)
 
     def set_host_limit(self, mac_address, upload_speed, download_speed):
         """
@@ -113,45 +503,104 @@ class HuaweiModem:
         </request>""".format(mac_address, upload_speed, download_speed)
         
         # We try a common qos-setup endpoint first
+        self.invalidate_cache("hosts", "qos")
         return self._send_custom_xml("qos/qos-setup", xml_data)
 
+    def set_host_limits(self, policy):
+        """
+        Applies bandwidth limits to many hosts at once.
+        The current QoS state is read once and only entries that differ are
+        sent, so re-applying the same policy sends nothing. If the state
+        cannot be read every entry is sent.
+        Args:
+            policy: dict of MAC address -> (upload, download) in KB/s, 0 = no limit
+        Returns:
+            dict of normalized MAC -> {"status": "unchanged" | "applied" |
+            "failed" | "invalid", "upload", "download", "error" (on failure)}
+        """
+        if not self.ctx:
+            return None
+
+        summary = {}
+        wanted = {}
+        for mac_address, (upload, download) in policy.items():
+            mac = normalize_mac(mac_address)
+            try:
+                limits = (int(upload), int(download))
+            except (TypeError, ValueError):
+                limits = None
+            if not self._is_valid_mac(mac) or limits is None or min(limits) < 0:
+                summary[mac] = {"status": "invalid", "upload": upload, "download": download,
+                                "error": "Invalid MAC address or limits"}
+                continue
+            wanted[mac] = limits
+            summary[mac] = {"status": "unchanged", "upload": limits[0], "download": limits[1]}
+
+        current = parse_qos_limits(self.get_qos_settings(fresh=True))
+        changes = diff_limits(current, wanted)
+
+        # The firmware takes one host per qos-setup request
+        for mac, (upload, download) in changes.items():
+            try:
+                result = self.set_host_limit(mac, upload, download)
+            except Exception as e:
+                result = {'type': 'error', 'error': {'message': str(e)}}
+            if result and result.get('type') == 'response':
+                summary[mac]["status"] = "applied"
+            else:
+                summary[mac]["status"] = "failed"
+                summary[mac]["error"] = (
+                    result.get('error', {}).get('message', 'Unknown error') if result else "No response"
+                )
+        return summary
+
+    @contextmanager
+    def screen(self):
+        """
+        Collects everything the _print_* helpers output inside the block and
+        writes it at once on exit (see utils.render.Renderer). Nested
+        screens share the outermost buffer.
+        """
+        if self._renderer is not None:
+            yield self._renderer
+            return
+        self._renderer = Renderer()
+        try:
+            yield self._renderer
+        finally:
+            renderer, self._renderer = self._renderer, None
+            renderer.flush()
+
+    def _emit(self, write):
+        """Runs write(renderer) on the current screen, or on a one-off renderer"""
+        if self._renderer is not None:
+            write(self._renderer)
+        else:
+            with Renderer() as renderer:
+                write(renderer)
+
     def _print_section_header(self, title):
         """Print a formatted section header"""
-        border = Colors.HEADER + "=" * (len(title) + 4) + Colors.ENDC
-        print(f"\n{border}")
-        print(f"{Colors.HEADER}{Colors.BOLD}  {title}  {Colors.ENDC}")
-        print(border)
+        self._emit(lambda out: out.section_header(title))
 
     def _print_key_value(self, key, value, indent=0):
         """Print a key-value pair with proper formatting"""
-        indent_str = " " * indent
-        if isinstance(value, dict):
-            print(f"{indent_str}{Colors.OKBLUE}{key}:{Colors.ENDC}")
-            for k, v in value.items():
-                self._print_key_value(k, v, indent + 2)
-        elif isinstance(value, list):
-            print(f"{indent_str}{Colors.OKBLUE}{key}:{Colors.ENDC}")
-            for i, item in enumerate(value, 1):
-                if isinstance(item, dict):
-                    print(f"{indent_str}  [{i}]")
-                    for k, v in item.items():
-                        self._print_key_value(k, v, indent + 4)
-                else:
-                    self._print_key_value(f"[{i}]", item, indent + 2)
-        else:
-            print(f"{indent_str}{Colors.OKBLUE}{key}:{Colors.ENDC} {Colors.OKGREEN}{value}{Colors.ENDC}")
+        self._emit(lambda out: out.key_value(key, value, indent))
 
     def _print_error(self, message):
         """Print an error message in red"""
-        print(f"{Colors.FAIL}❌ {message}{Colors.ENDC}")
+        if not self.quiet:
+            self._emit(lambda out: out.error(message))
 
     def _print_success(self, message):
         """Print a success message in green"""
-        print(f"{Colors.OKGREEN}✓ {message}{Colors.ENDC}")
+        if not self.quiet:
+            self._emit(lambda out: out.success(message))
 
     def _print_info(self, message):
         """Print an info message in blue"""
-        print(f"{Colors.OKBLUE}ℹ {message}{Colors.ENDC}")
+        if not self.quiet:
+            self._emit(lambda out: out.info(message))
 
     def sync_device_list(self):
         """Sync known devices with currently connected hosts"""
@@ -169,32 +618,70 @@ class HuaweiModem:
         """Get all known devices that have ever connected"""
         return get_known_devices()
 
+    def get_blocked_macs(self, fresh=False):
+        """
+        Returns the set of MAC addresses blocked by the modem's MAC filter.
+        The parsed set is cached alongside the filter settings, so repeated
+        lookups cost nothing until the TTL expires or a block/unblock
+        invalidates it.
+        Returns:
+            frozenset of normalized MAC addresses, or None if the filter
+            could not be read
+        """
+        if not self.ctx:
+            return None
+        cache_key = ("mac_filter", "blocked")
+        if not fresh:
+            hit, blocked = self.cache.get(cache_key)
+            if hit:
+                return blocked
+
+        filter_data = self.get_mac_filter_settings(fresh=fresh)
+        if not filter_data or filter_data.get('type') == 'error':
+            return None
+        blocked = frozenset(parse_blocked_macs(filter_data))
+        self.cache.set(cache_key, blocked, CACHE_TTLS["mac_filter"])
+        return blocked
+
+    def are_devices_blocked(self, mac_addresses):
+        """
+        Check the blocked status of many devices with a single filter fetch.
+        Returns:
+            dict of normalized MAC address -> True if blocked
+            (all False if the filter could not be read)
+        """
+        blocked = self.get_blocked_macs() or frozenset()
+        return {mac: mac in blocked for mac in map(normalize_mac, mac_addresses)}
+
     def get_blocked_devices(self):
         """
-        Get list of currently blocked MAC addresses.
-        Returns list of MAC addresses that are blocked.
+        Get the devices currently blocked by the modem's MAC filter.
+        Returns list of device dictionaries, using the known device record
+        when there is one; falls back to the tracker's blocked flags if the
+        filter cannot be read.
         """
         if not self.ctx:
             return None
         try:
-            # Get MAC filter settings
-            result = huaweisms.api.wlan.get_mac_filter_settings(self.ctx)
-            if result and 'response' in result:
-                # Parse blocked MAC addresses from response
-                # This is a placeholder - actual implementation depends on modem firmware
-                blocked_macs = []
-                # Implementation would extract MAC addresses from API response
-                return blocked_macs
-            return []
+            blocked = self.get_blocked_macs()
+            if blocked is None:
+                return get_blocked_devices()
+            known = {normalize_mac(d.get('MacAddress', '')): d for d in get_known_devices()}
+            return [known.get(mac, {"MacAddress": mac}) for mac in sorted(blocked)]
         except Exception as e:
             self._print_error(f"Failed to get blocked devices: {e}")
             return []
 
-    def block_device(self, mac_address):
+    def mac_filter(self):
+        """Returns a MacFilterManager for batching block/unblock operations."""
+        return MacFilterManager(self)
+
+    def update_blocked_devices(self, block=(), unblock=()):
         """
-        Block a device by MAC address.
+        Blocks and unblocks several devices with one filter read and one write.
         Args:
-            mac_address: MAC address to block (format: XX:XX:XX:XX:XX:XX)
+            block: MAC addresses to block
+            unblock: MAC addresses to unblock (applied after block)
         Returns:
             True if successful, False otherwise
         """
@@ -202,39 +689,29 @@ class HuaweiModem:
             return False
 
         try:
-            # Normalize MAC address format
-            mac = mac_address.upper().replace('-', ':').replace('.', ':')
-
-            # Validate MAC address format
-            if not self._is_valid_mac(mac):
-                self._print_error(f"Invalid MAC address format: {mac_address}")
-                return False
-
-            # Get current MAC filter settings
-            current_settings = huaweisms.api.wlan.get_mac_filter_settings(self.ctx)
-
-            # Update settings to include the new blocked MAC
-            # This is a placeholder - actual implementation depends on modem firmware
-            xml_data = """<?xml version="1.0" encoding="UTF-8"?>
-            <request>
-                <MacAddressList>{}</MacAddressList>
-                <FilterMode>1</FilterMode>
-                <Enable>1</Enable>
-            </request>""".format(mac)
-
-            result = self._send_custom_xml("wlan/multi-cast-settings", xml_data)
-
-            if result and 'OK' in str(result):
-                self._print_success(f"Device {mac} blocked successfully")
-                return True
-            else:
-                self._print_error(f"Failed to block device {mac}")
-                return False
-
+            manager = self.mac_filter().load()
+            manager.apply(block=block, unblock=unblock)
+            manager.commit()
+            return True
         except Exception as e:
-            self._print_error(f"Error blocking device: {e}")
+            self._print_error(f"Error updating MAC filter: {e}")
             return False
 
+    def block_device(self, mac_address):
+        """
+        Block a device by MAC address.
+        Args:
+            mac_address: MAC address to block (format: XX:XX:XX:XX:XX:XX)
+        Returns:
+            True if successful, False otherwise
+        """
+        mac = normalize_mac(mac_address)
+        if self.update_blocked_devices(block=[mac]):
+            self._print_success(f"Device {mac} blocked successfully")
+            return True
+        self._print_error(f"Failed to block device {mac}")
+        return False
+
     def unblock_device(self, mac_address):
         """
         Unblock a device by MAC address.
@@ -243,39 +720,12 @@ class HuaweiModem:
         Returns:
             True if successful, False otherwise
         """
-        if not self.ctx:
-            return False
-
-        try:
-            # Normalize MAC address format
-            mac = mac_address.upper().replace('-', ':').replace('.', ':')
-
-            # Validate MAC address format
-            if not self._is_valid_mac(mac):
-                self._print_error(f"Invalid MAC address format: {mac_address}")
-                return False
-
-            # Get current MAC filter settings and remove the MAC
-            # This is a placeholder - actual implementation depends on modem firmware
-            xml_data = """<?xml version="1.0" encoding="UTF-8"?>
-            <request>
-                <MacAddressList></MacAddressList>
-                <FilterMode>0</FilterMode>
-                <Enable>0</Enable>
-            </request>"""
-
-            result = self._send_custom_xml("wlan/multi-cast-settings", xml_data)
-
-            if result and 'OK' in str(result):
-                self._print_success(f"Device {mac} unblocked successfully")
-                return True
-            else:
-                self._print_error(f"Failed to unblock device {mac}")
-                return False
-
-        except Exception as e:
-            self._print_error(f"Error unblocking device: {e}")
-            return False
+        mac = normalize_mac(mac_address)
+        if self.update_blocked_devices(unblock=[mac]):
+            self._print_success(f"Device {mac} unblocked successfully")
+            return True
+        self._print_error(f"Failed to unblock device {mac}")
+        return False
 
     def is_device_blocked(self, mac_address):
         """
@@ -289,14 +739,13 @@ class HuaweiModem:
             return False
 
         try:
-            blocked_macs = self.get_blocked_devices()
-            mac = mac_address.upper().replace('-', ':').replace('.', ':')
-            return mac in blocked_macs
+            return self.are_devices_blocked([mac_address])[normalize_mac(mac_address)]
         except Exception as e:
             self._print_error(f"Error checking device status: {e}")
             return False
 
-    def _is_valid_mac(self, mac_address):
+    @staticmethod
+    def _is_valid_mac(mac_address):
         """
         Validate MAC address format.
         Args:
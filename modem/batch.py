@@ -0,0 +1,160 @@
+"""
+Batch module - Non-interactive operations with JSON lines output
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import shlex
+import time
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from modem import HuaweiModem
+
+# Operation -> (argument names, HuaweiModem method, is_read, help text)
+BATCH_OPERATIONS = {
+    "hosts": ((), "get_connected_hosts", True, "List connected hosts"),
+    "status": ((), "get_status", True, "Show connection status"),
+    "info": ((), "get_device_info", True, "Show device information"),
+    "sms-list": (("count",), "get_sms_list", True, "List the latest COUNT SMS messages"),
+    "send-sms": (("number", "text"), "send_sms", False, "Send an SMS message"),
+    "sms-sync": ((), "sync_sms", False, "Archive SMS messages that arrived since the last sync"),
+    "sms-search": (("query",), "search_sms", False,
+                   "Search archived SMS (words, from:NUMBER, since:DATE, until:DATE)"),
+    "block": (("mac",), "block_device", False, "Block a device by MAC address"),
+    "unblock": (("mac",), "unblock_device", False, "Unblock a device by MAC address"),
+    "limit": (("mac", "upload", "download"), "set_host_limit", False,
+              "Set upload/download limits in KB/s (0 = no limit)"),
+}
+
+
+def _method_kwargs(op: str, args: List[str]) -> Dict:
+    """Convert operation arguments into keyword arguments of the modem method"""
+    if op == "sms-list":
+        return {"qty": int(args[0])}
+    if op == "sms-search":
+        return {"query": args[0]}
+    if op == "send-sms":
+        return {"phone_number": args[0], "message": args[1]}
+    if op in ("block", "unblock"):
+        return {"mac_address": args[0]}
+    if op == "limit":
+        return {"mac_address": args[0], "upload_speed": int(args[1]), "download_speed": int(args[2])}
+    return {}
+
+
+def parse_operation(line: str) -> Tuple[str, List[str]]:
+    """
+    Parse one batch line such as 'limit AA:BB:CC:DD:EE:FF 100 500'.
+    Raises ValueError for unknown operations or wrong arguments.
+    """
+    parts = shlex.split(line)
+    if not parts:
+        raise ValueError("Empty operation")
+    op, args = parts[0], parts[1:]
+    if op not in BATCH_OPERATIONS:
+        raise ValueError(f"Unknown operation: {op}")
+    names = BATCH_OPERATIONS[op][0]
+    usage = " ".join([op] + [n.upper() for n in names])
+    if len(args) != len(names):
+        raise ValueError(f"Usage: {usage}")
+    if "mac" in names and not HuaweiModem._is_valid_mac(args[names.index("mac")]):
+        raise ValueError(f"Invalid MAC address {args[names.index('mac')]!r}. Usage: {usage}")
+    _method_kwargs(op, args)  # validates numeric arguments
+    return op, args
+
+
+def read_operations(lines: Iterable[str]) -> List[Tuple[str, object]]:
+    """
+    Parse batch lines, skipping blanks and '#' comments.
+    Returns:
+        list of (line, (op, args)) or (line, ValueError) for invalid lines
+    """
+    parsed = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            parsed.append((line, parse_operation(line)))
+        except ValueError as e:
+            parsed.append((line, e))
+    return parsed
+
+
+def _outcome(op: str, args: List[str], value=None, error=None, elapsed: float = 0.0) -> Dict:
+    outcome = {"op": op, "args": args, "ok": error is None, "elapsed_ms": round(elapsed * 1000, 1)}
+    if error is None and isinstance(value, dict) and value.get('type') == 'error':
+        error = value.get('error', {}).get('message') or value.get('error')
+        outcome["ok"] = False
+    if error is None and value is False:
+        outcome["ok"] = False
+        error = f"{op} failed"
+    if outcome["ok"]:
+        outcome["result"] = value
+    else:
+        outcome["error"] = str(error)
+    return outcome
+
+
+def run_operations(modem, operations: List[Tuple[str, object]]) -> Iterator[Dict]:
+    """
+    Run parsed operations on one authenticated modem, yielding one result
+    dict per operation in input order. Consecutive reads are fetched
+    concurrently; writes run one at a time, in order, between them.
+    """
+    pending_reads: List[Tuple[str, str, List[str]]] = []
+
+    def flush_reads():
+        calls = {}
+        for key, op, args in pending_reads:
+            method = BATCH_OPERATIONS[op][1]
+            calls[key] = (method, _method_kwargs(op, args))
+        results = modem.fetch_many(calls)
+        for key, op, args in pending_reads:
+            r = results[key]
+            yield _outcome(op, args, value=r.value, error=r.error, elapsed=r.elapsed)
+        pending_reads.clear()
+
+    for index, (line, parsed) in enumerate(operations):
+        if isinstance(parsed, Exception):
+            yield from flush_reads()
+            yield {"op": line, "args": [], "ok": False, "elapsed_ms": 0.0, "error": str(parsed)}
+            continue
+
+        op, args = parsed
+        if BATCH_OPERATIONS[op][2]:
+            pending_reads.append((str(index), op, args))
+            continue
+
+        yield from flush_reads()
+        start = time.perf_counter()
+        try:
+            value = getattr(modem, BATCH_OPERATIONS[op][1])(**_method_kwargs(op, args))
+            yield _outcome(op, args, value=value, elapsed=time.perf_counter() - start)
+        except Exception as e:
+            yield _outcome(op, args, error=e, elapsed=time.perf_counter() - start)
+
+    yield from flush_reads()
+
+
+def print_json_lines(results: Iterable[Dict]) -> bool:
+    """Print each result as one JSON line; returns True if every operation succeeded"""
+    all_ok = True
+    for result in results:
+        all_ok = all_ok and result["ok"]
+        print(json.dumps(result, default=str), flush=True)
+    return all_ok
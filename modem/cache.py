@@ -0,0 +1,80 @@
+"""
+Cache module - Small TTL cache for modem API responses
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a per-entry TTL.
+    Keys are tuples whose first element is the endpoint name, so all
+    entries of an endpoint can be invalidated together.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Tuple[bool, Any]:
+        """Return (True, value) for a live entry, (False, None) otherwise"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: Tuple[Hashable, ...], value: Any, ttl: float):
+        """Store a value for ttl seconds, evicting expired then least recently used entries"""
+        if ttl <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._data[key] = (now + ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                for stale in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+                    del self._data[stale]
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, *endpoints: str):
+        """Drop every entry belonging to the given endpoints"""
+        with self._lock:
+            for key in [k for k in self._data if k[0] in endpoints]:
+                del self._data[key]
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,148 @@
+"""
+Daemon module - Background polling of connected hosts and modem status
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import logging
+import signal
+import threading
+import time
+from typing import Optional
+
+from config import DAEMON_MIN_INTERVAL, DAEMON_MAX_INTERVAL, DAEMON_BACKOFF
+from modem.timeseries import TimeSeriesStore
+from modem.device_tracker import extract_hosts, sync_devices, flush_devices, get_write_stats
+
+logger = logging.getLogger("huawei_connect.daemon")
+
+# Status fields whose change counts as activity
+STATUS_FIELDS = ('ConnectionStatus', 'CurrentNetworkType', 'SignalIcon')
+
+
+def _snapshot(hosts_data, status_data) -> frozenset:
+    """Reduce a poll result to the facts whose change should speed up polling"""
+    facts = set()
+    for host in extract_hosts(hosts_data):
+        facts.add(("host", host.get('MacAddress', '').upper(),
+                   host.get('IpAddress'), host.get('HostName')))
+    status = (status_data or {}).get('response', {}) if isinstance(status_data, dict) else {}
+    for field in STATUS_FIELDS:
+        facts.add(("status", field, status.get(field)))
+    return frozenset(facts)
+
+
+class PollingDaemon:
+    """
+    Polls get_connected_hosts and get_status and feeds the device tracker.
+    The interval drops to min_interval after a change and grows by the
+    backoff factor on every quiet or failed cycle, up to max_interval.
+    With a timeseries_dir, signal and traffic are polled as well and every
+    cycle is recorded into a memory-mapped TimeSeriesStore in that directory.
+    """
+
+    def __init__(self, modem, min_interval: float = DAEMON_MIN_INTERVAL,
+                 max_interval: float = DAEMON_MAX_INTERVAL, backoff: float = DAEMON_BACKOFF,
+                 timeseries_dir: Optional[str] = None):
+        self.modem = modem
+        self.timeseries_dir = timeseries_dir
+        self.timeseries: Optional[TimeSeriesStore] = None
+        if timeseries_dir:
+            self.timeseries = TimeSeriesStore()
+            if not self.timeseries.load(timeseries_dir, modem.modem_host, writable=True):
+                # Create an empty series file first, so it can be memory-mapped
+                self.timeseries.get(modem.modem_host)
+                self.timeseries.save(timeseries_dir)
+                self.timeseries.load(timeseries_dir, modem.modem_host, writable=True)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.cycles = 0
+        self.errors = 0
+        self._last_snapshot: Optional[frozenset] = None
+        self._stop = threading.Event()
+
+    def stop(self, *_):
+        """Ask the polling loop to exit after the current cycle"""
+        self._stop.set()
+
+    def run_cycle(self) -> bool:
+        """
+        Poll once and sync the tracker.
+        Returns:
+            True if hosts or status changed since the previous cycle
+        """
+        calls = {
+            "hosts": ("get_connected_hosts", {"fresh": True}),
+            "status": ("get_status", {"fresh": True}),
+        }
+        if self.timeseries:
+            calls["signal"] = ("get_signal", {"fresh": True})
+            calls["traffic"] = ("get_traffic_statistics", {"fresh": True})
+        results = self.modem.fetch_many(calls)
+        hosts, status = results["hosts"], results["status"]
+        if not hosts.ok:
+            raise hosts.error
+
+        sync_devices(hosts.value)
+        if not status.ok:
+            logger.warning("status poll failed: %s", status.error)
+        if self.timeseries:
+            self.timeseries.record(self.modem.modem_host, *(
+                results[name].value for name in ("status", "signal", "traffic")
+                if results[name].ok
+            ))
+
+        snapshot = _snapshot(hosts.value, status.value if status.ok else None)
+        changed = snapshot != self._last_snapshot
+        self._last_snapshot = snapshot
+        return changed
+
+    def _next_interval(self, changed: bool) -> float:
+        if changed:
+            return self.min_interval
+        return min(self.interval * self.backoff, self.max_interval)
+
+    def run(self):
+        """Poll until SIGINT/SIGTERM, then flush the tracker and close the modem"""
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        logger.info("polling %s every %g-%gs", self.modem.modem_host,
+                    self.min_interval, self.max_interval)
+
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                try:
+                    changed = self.run_cycle()
+                except Exception as e:
+                    self.errors += 1
+                    changed = False
+                    logger.error("cycle %d failed: %s", self.cycles + 1, e)
+                self.cycles += 1
+                self.interval = self._next_interval(changed)
+                logger.info("cycle %d took %.0fms, changed=%s, next poll in %.1fs",
+                            self.cycles, (time.perf_counter() - start) * 1000,
+                            changed, self.interval)
+                self._stop.wait(self.interval)
+        finally:
+            if self.timeseries:
+                self.timeseries.save(self.timeseries_dir)
+            flush_devices()
+            self.modem.close()
+            logger.info("stopped after %d cycles (%d failed), tracker writes: %s",
+                        self.cycles, self.errors, get_write_stats())
@@ -0,0 +1,326 @@
+"""
+Device DB module - SQLite-backed storage for the known devices tracker
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import TRACKER_FLUSH_INTERVAL
+from modem.device_tracker import DeviceStore, has_json_data, normalize_mac
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    mac TEXT PRIMARY KEY,
+    host_name TEXT NOT NULL DEFAULT 'Unknown',
+    ip_address TEXT NOT NULL DEFAULT 'Unknown',
+    connection_type TEXT NOT NULL DEFAULT 'Unknown',
+    is_connected INTEGER NOT NULL DEFAULT 0,
+    is_blocked INTEGER NOT NULL DEFAULT 0,
+    first_seen TEXT,
+    last_seen TEXT,
+    last_disconnected TEXT,
+    blocked_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_devices_last_seen ON devices(last_seen);
+CREATE INDEX IF NOT EXISTS idx_devices_connected ON devices(is_connected, last_seen);
+CREATE INDEX IF NOT EXISTS idx_devices_blocked ON devices(is_blocked, blocked_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Column name -> key used in the known_devices.json layout
+COLUMNS = (
+    ("mac", "MacAddress"),
+    ("host_name", "HostName"),
+    ("ip_address", "IpAddress"),
+    ("connection_type", "ConnectionType"),
+    ("is_connected", "is_connected"),
+    ("is_blocked", "is_blocked"),
+    ("first_seen", "first_seen"),
+    ("last_seen", "last_seen"),
+    ("last_disconnected", "last_disconnected"),
+    ("blocked_at", "blocked_at"),
+)
+SELECT_DEVICES = "SELECT {} FROM devices".format(", ".join(c for c, _ in COLUMNS))
+
+UPSERT_HOST = """
+INSERT INTO devices (mac, host_name, ip_address, connection_type,
+                     is_connected, is_blocked, first_seen, last_seen)
+VALUES (:mac, COALESCE(:host_name, 'Unknown'), COALESCE(:ip_address, 'Unknown'),
+        COALESCE(:connection_type, 'Unknown'), 1, 0, :now, :now)
+ON CONFLICT(mac) DO UPDATE SET
+    host_name = COALESCE(:host_name, host_name),
+    ip_address = COALESCE(:ip_address, ip_address),
+    connection_type = COALESCE(:connection_type, connection_type),
+    is_connected = 1,
+    last_seen = :now
+"""
+
+# Columns compared to decide whether a connected host changed
+HOST_COLUMNS = ("host_name", "ip_address", "connection_type")
+
+
+def _row_to_device(row) -> Dict:
+    """Convert a devices row to the dict layout used by the JSON tracker"""
+    device = {}
+    for (column, key), value in zip(COLUMNS, row):
+        if column in ("is_connected", "is_blocked"):
+            device[key] = bool(value)
+        elif value is not None or column in ("first_seen", "last_seen"):
+            device[key] = value
+    return device
+
+
+class SQLiteDeviceStore:
+    """
+    Known devices tracker stored in SQLite.
+    Offers the same interface as DeviceStore; every read is an indexed
+    query and every write is a single transaction, so an interrupted
+    process can never leave a half-written file behind.
+    Syncs that only refresh last_seen are deferred like in DeviceStore.
+    """
+
+    def __init__(self, path: str, json_path: Optional[str] = None,
+                 flush_interval: float = TRACKER_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.writes = 0
+        self.skipped_writes = 0
+        self._pending_seen: Optional[str] = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        if json_path and not self._get_meta("migrated_from_json") and has_json_data(json_path):
+            self.migrate_from_json(json_path)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def _touch(self):
+        self._set_meta("last_updated", datetime.now().isoformat())
+
+    def _query(self, where: str = "", params=()) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(f"{SELECT_DEVICES} {where}", params).fetchall()
+        return [_row_to_device(row) for row in rows]
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        Import every device of a JSON store (the known_devices.json snapshot
+        plus the changes in its event log) in one transaction.
+        Returns:
+            Number of devices imported
+        """
+        devices = DeviceStore(json_path).to_data().get("devices", [])
+        rows = []
+        for device in devices:
+            mac = normalize_mac(device.get('MacAddress', ''))
+            if not mac:
+                continue
+            rows.append((
+                mac,
+                device.get('HostName', 'Unknown'),
+                device.get('IpAddress', 'Unknown'),
+                device.get('ConnectionType', 'Unknown'),
+                int(bool(device.get('is_connected', False))),
+                int(bool(device.get('is_blocked', False))),
+                device.get('first_seen'),
+                device.get('last_seen'),
+                device.get('last_disconnected'),
+                device.get('blocked_at'),
+            ))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO devices ({}) VALUES ({})".format(
+                    ", ".join(c for c, _ in COLUMNS), ", ".join("?" * len(COLUMNS))
+                ),
+                rows
+            )
+            self._set_meta("migrated_from_json", os.path.abspath(json_path))
+            self._touch()
+        return len(rows)
+
+    def to_data(self) -> Dict:
+        """Return the store in the known_devices.json layout"""
+        with self._lock:
+            last_updated = self._get_meta("last_updated")
+        return {"devices": self.all(), "last_updated": last_updated}
+
+    def save(self) -> bool:
+        """Write a deferred last_seen refresh once flush_interval has elapsed"""
+        if self._pending_seen:
+            if time.monotonic() - self._last_flush < self.flush_interval:
+                self.skipped_writes += 1
+                return True
+            return self.flush()
+        return True
+
+    def flush(self) -> bool:
+        """Write a deferred last_seen refresh now"""
+        with self._lock, self._conn:
+            self._flush_seen()
+        return True
+
+    def _flush_seen(self):
+        # Caller holds the lock and an open transaction
+        if self._pending_seen:
+            self._conn.execute(
+                "UPDATE devices SET last_seen = ? WHERE is_connected = 1",
+                (self._pending_seen,)
+            )
+            self._pending_seen = None
+            self._last_flush = time.monotonic()
+            self.writes += 1
+
+    def write_stats(self) -> Dict[str, int]:
+        """Return how many writes were performed and how many were skipped"""
+        return {"writes": self.writes, "skipped_writes": self.skipped_writes}
+
+    def get(self, mac_address: str) -> Optional[Dict]:
+        devices = self._query("WHERE mac = ?", (normalize_mac(mac_address),))
+        return devices[0] if devices else None
+
+    def is_known(self, mac_address: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM devices WHERE mac = ?", (normalize_mac(mac_address),)
+            ).fetchone()
+        return row is not None
+
+    def all(self) -> List[Dict]:
+        return self._query("ORDER BY rowid")
+
+    def connected(self) -> List[Dict]:
+        return self._query("WHERE is_connected = 1")
+
+    def disconnected(self) -> List[Dict]:
+        return self._query("WHERE is_connected = 0 ORDER BY last_seen DESC")
+
+    def blocked(self) -> List[Dict]:
+        return self._query(
+            "WHERE is_blocked = 1 ORDER BY COALESCE(blocked_at, last_seen, '') DESC"
+        )
+
+    def sync(self, hosts: List[Dict]):
+        """
+        Upsert new or changed connected hosts and mark the rest disconnected.
+        When nothing but last_seen would change, the write is deferred.
+        """
+        now = datetime.now().isoformat()
+        params = {}
+        for host in hosts:
+            mac = normalize_mac(host.get('MacAddress', ''))
+            if not mac:
+                continue
+            params[mac] = {
+                "mac": mac,
+                "host_name": host.get('HostName'),
+                "ip_address": host.get('IpAddress'),
+                "connection_type": host.get('ConnectionType'),
+                "now": now,
+            }
+
+        with self._lock:
+            connected = {
+                row[0]: row[1:] for row in self._conn.execute(
+                    "SELECT mac, {} FROM devices WHERE is_connected = 1".format(", ".join(HOST_COLUMNS))
+                )
+            }
+            changed = [
+                p for mac, p in params.items()
+                if mac not in connected or any(
+                    p[column] is not None and p[column] != current
+                    for column, current in zip(HOST_COLUMNS, connected[mac])
+                )
+            ]
+            gone = [(now, mac) for mac in connected if mac not in params]
+
+            if not changed and not gone:
+                self._pending_seen = now
+                return
+
+            with self._conn:
+                self._pending_seen = None
+                self._conn.executemany(UPSERT_HOST, changed)
+                self._conn.executemany(
+                    "UPDATE devices SET is_connected = 0, last_disconnected = ? WHERE mac = ?",
+                    gone
+                )
+                self._conn.execute(
+                    "UPDATE devices SET last_seen = ? WHERE is_connected = 1", (now,)
+                )
+                self._touch()
+            self._last_flush = time.monotonic()
+            self.writes += 1
+
+    def set_blocked(self, mac_address: str, blocked: bool = True) -> bool:
+        """Set the blocked flag of a known device; returns False if unknown"""
+        blocked_at = datetime.now().isoformat() if blocked else None
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE devices SET is_blocked = ?, blocked_at = ? WHERE mac = ?",
+                (int(blocked), blocked_at, normalize_mac(mac_address))
+            )
+            if cursor.rowcount:
+                self._touch()
+                self.writes += 1
+        return cursor.rowcount > 0
+
+    def set_blocked_many(self, changes: Dict[str, bool]) -> int:
+        """Set the blocked flag of several known devices in one transaction"""
+        blocked_at = datetime.now().isoformat()
+        rows = [
+            (int(blocked), blocked_at if blocked else None, normalize_mac(mac), int(blocked))
+            for mac, blocked in changes.items()
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "UPDATE devices SET is_blocked = ?, blocked_at = ? WHERE mac = ? AND is_blocked != ?",
+                rows
+            )
+            updated = self._conn.total_changes - before
+            if updated:
+                self._touch()
+                self.writes += 1
+        return updated
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM devices")
+            self._touch()
+
+    def close(self):
+        self._conn.close()
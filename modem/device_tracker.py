@@ -17,18 +17,29 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+import atexit
 import json
 import os
+import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
+from config import DEVICE_STORE_BACKEND, DEVICE_LOG_COMPACT_BYTES, TRACKER_FLUSH_INTERVAL
 
 KNOWN_DEVICES_FILE = "known_devices.json"
+KNOWN_DEVICES_DB = "known_devices.db"
 
-def load_known_devices() -> Dict:
+# Host fields copied from wlan/host-list entries into the device records
+HOST_FIELDS = ('HostName', 'IpAddress', 'ConnectionType')
+
+def normalize_mac(mac_address: str) -> str:
+    """Normalize a MAC address to upper-case, colon-separated form"""
+    return (mac_address or '').strip().upper().replace('-', ':').replace('.', ':')
+
+def load_known_devices(path: str = KNOWN_DEVICES_FILE) -> Dict:
     """Load known devices from JSON file"""
-    if os.path.exists(KNOWN_DEVICES_FILE):
+    if os.path.exists(path):
         try:
-            with open(KNOWN_DEVICES_FILE, 'r') as f:
+            with open(path, 'r') as f:
                 data = json.load(f)
                 return data
         except (json.JSONDecodeError, IOError):
@@ -39,114 +50,422 @@ def load_known_devices() -> Dict:
         "last_updated": None
     }
 
-def save_known_devices(data: Dict) -> bool:
-    """Save known devices to JSON file"""
+def save_known_devices(data: Dict, path: str = KNOWN_DEVICES_FILE) -> bool:
+    """Save known devices to JSON file (atomically, via a temporary file)"""
     try:
         data["last_updated"] = datetime.now().isoformat()
-        with open(KNOWN_DEVICES_FILE, 'w') as f:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
             json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
         return True
     except IOError:
         return False
 
-def sync_devices(current_hosts: Optional[Dict]) -> Dict:
+def extract_hosts(current_hosts: Optional[Dict]) -> List[Dict]:
+    """Return the host list from a wlan/host-list response (may be empty)"""
+    if not current_hosts or 'response' not in current_hosts:
+        return []
+    try:
+        hosts = current_hosts['response'].get('Hosts', {}).get('Host', [])
+    except (AttributeError, TypeError):
+        return []
+    if not hosts:
+        return []
+    if not isinstance(hosts, list):
+        hosts = [hosts]
+    return hosts
+
+def is_host_list(current_hosts: Optional[Dict]) -> bool:
+    """Whether a wlan/host-list result is a successful response, even one with no hosts"""
+    return (isinstance(current_hosts, dict) and current_hosts.get('type') != 'error'
+            and isinstance(current_hosts.get('response'), dict))
+
+def log_path_for(path: str) -> str:
+    """Event log kept next to a known_devices.json snapshot"""
+    return f"{os.path.splitext(path)[0]}.log"
+
+def has_json_data(path: str = KNOWN_DEVICES_FILE) -> bool:
+    """Whether a JSON store (snapshot or event log) exists at path"""
+    return os.path.exists(path) or os.path.exists(log_path_for(path))
+
+class DeviceStore:
     """
-    Sync known devices with currently connected hosts
-    Returns updated known devices data
+    In-memory store of known devices.
+    State is a snapshot (known_devices.json) plus an append-only event log
+    (known_devices.log) of connect, update, disconnect, block, unblock and
+    seen events, one compact JSON record per line. Syncing appends only the
+    events that changed something; once the log reaches
+    DEVICE_LOG_COMPACT_BYTES it is folded into a new snapshot and moved to
+    known_devices.history.log, which keeps every past session.
+
+    Syncs that only refresh last_seen are coalesced in memory and written
+    at most once per flush_interval seconds (or by flush() at exit), while
+    membership, IP, hostname and block changes are written right away.
+
+    Devices are indexed by normalized MAC address, with secondary indexes
+    of connected, disconnected and blocked MACs, so reads never touch disk
+    and cost O(1) or O(result).
     """
-    data = load_known_devices()
-    known_devices = data.get("devices", [])
 
-    if not current_hosts or 'response' not in current_hosts:
-        return data
+    def __init__(self, path: str = KNOWN_DEVICES_FILE,
+                 compact_threshold: int = DEVICE_LOG_COMPACT_BYTES,
+                 flush_interval: float = TRACKER_FLUSH_INTERVAL):
+        base = os.path.splitext(path)[0]
+        self.path = path
+        self.log_path = log_path_for(path)
+        self.history_path = f"{base}.history.log"
+        self.compact_threshold = compact_threshold
+        self.flush_interval = flush_interval
+        self.writes = 0
+        self.skipped_writes = 0
+        self.last_updated = None
+        self._devices: Dict[str, Dict] = {}
+        self._connected: Set[str] = set()
+        self._disconnected: Set[str] = set()
+        self._blocked: Set[str] = set()
+        self._seq = 0
+        self._pending: List[Dict] = []
+        self._pending_seen: Optional[str] = None
+        self._last_flush = time.monotonic()
+        self._log_size = 0
+        self._compact_due = False
+        self._load()
+
+    def _load(self):
+        data = load_known_devices(self.path)
+        self.last_updated = data.get("last_updated")
+        self._seq = data.get("seq", 0)
+        for device in data.get("devices", []):
+            mac = normalize_mac(device.get('MacAddress', ''))
+            if mac:
+                device.setdefault('is_blocked', False)
+                self._devices[mac] = device
+                self._reindex(mac)
+
+        for event in self._read_log(self.log_path):
+            # Events already folded into the snapshot are skipped, so a crash
+            # between writing the snapshot and truncating the log is harmless
+            if event.get("n", 0) > self._seq:
+                self._apply(event)
+                self._seq = event["n"]
+                self.last_updated = event["t"]
+        try:
+            self._log_size = os.path.getsize(self.log_path)
+        except OSError:
+            self._log_size = 0
 
-    try:
-        hosts = current_hosts['response'].get('Hosts', {}).get('Host', [])
-        if not hosts:
-            return data
+    @staticmethod
+    def _read_log(path: str):
+        """Yield events from a log file, skipping a torn trailing line"""
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except IOError:
+            return
+
+    def _reindex(self, mac: str):
+        """Refresh the secondary indexes for one device"""
+        device = self._devices[mac]
+        if device.get('is_connected', False):
+            self._connected.add(mac)
+            self._disconnected.discard(mac)
+        else:
+            self._disconnected.add(mac)
+            self._connected.discard(mac)
+        if device.get('is_blocked', False):
+            self._blocked.add(mac)
+        else:
+            self._blocked.discard(mac)
+
+    def _apply(self, event: Dict):
+        """Apply one event to the in-memory state"""
+        kind, when = event["e"], event["t"]
+        if kind == "seen":
+            for mac in self._connected:
+                self._devices[mac]['last_seen'] = when
+            return
+
+        mac = event["mac"]
+        device = self._devices.get(mac)
+        if kind in ("connect", "update"):
+            if device is None:
+                device = self._devices[mac] = {
+                    'MacAddress': mac,
+                    'HostName': 'Unknown',
+                    'IpAddress': 'Unknown',
+                    'ConnectionType': 'Unknown',
+                    'is_connected': True,
+                    'is_blocked': False,
+                    'first_seen': when,
+                    'last_seen': when
+                }
+            for key in HOST_FIELDS:
+                if key in event:
+                    device[key] = event[key]
+            device['is_connected'] = True
+            device['last_seen'] = when
+        elif device is None:
+            return
+        elif kind == "disconnect":
+            device['is_connected'] = False
+            device['last_disconnected'] = when
+        elif kind == "block":
+            device['is_blocked'] = True
+            device['blocked_at'] = when
+        elif kind == "unblock":
+            device['is_blocked'] = False
+            device.pop('blocked_at', None)
+        self._reindex(mac)
+
+    def _queue_pending_seen(self):
+        """Move a coalesced 'seen' (already applied in memory) into the write queue"""
+        if self._pending_seen:
+            self._seq += 1
+            self._pending.append({"e": "seen", "n": self._seq, "t": self._pending_seen})
+            self._pending_seen = None
+
+    def _record(self, events: List[Dict]):
+        """Stamp, apply and queue events for the next save()"""
+        # Keep the log in order: an earlier coalesced 'seen' goes first
+        self._queue_pending_seen()
+        now = datetime.now().isoformat()
+        for event in events:
+            self._seq += 1
+            event["n"] = self._seq
+            event["t"] = now
+            self._apply(event)
+            self._pending.append(event)
+
+    def to_data(self) -> Dict:
+        """Return the store in the known_devices.json layout"""
+        return {
+            "devices": list(self._devices.values()),
+            "last_updated": self.last_updated
+        }
+
+    def save(self) -> bool:
+        """
+        Append pending events to the log, compacting it when it grows too large.
+        A pending timestamp-only refresh is skipped unless flush_interval
+        has elapsed since the last write.
+        """
+        if not self._pending and self._pending_seen:
+            if time.monotonic() - self._last_flush < self.flush_interval:
+                self.skipped_writes += 1
+                return True
+            self._queue_pending_seen()
+        return self._write_pending()
+
+    def flush(self) -> bool:
+        """Write every pending change, including coalesced timestamps"""
+        self._queue_pending_seen()
+        return self._write_pending()
+
+    def write_stats(self) -> Dict[str, int]:
+        """Return how many writes were performed and how many were skipped"""
+        return {"writes": self.writes, "skipped_writes": self.skipped_writes}
+
+    def _write_pending(self) -> bool:
+        if self._pending:
+            lines = "".join(json.dumps(e, separators=(',', ':')) + "\n" for e in self._pending)
+            try:
+                with open(self.log_path, 'a') as f:
+                    f.write(lines)
+            except IOError:
+                return False
+            self._log_size += len(lines.encode('utf-8'))
+            self.last_updated = self._pending[-1]["t"]
+            self._pending.clear()
+            self._last_flush = time.monotonic()
+            self.writes += 1
+
+        if self._compact_due or self._log_size >= self.compact_threshold:
+            return self.compact()
+        return True
+
+    def compact(self) -> bool:
+        """Fold the event log into a new snapshot and archive it to the history log"""
+        data = self.to_data()
+        data["seq"] = self._seq
+        if not save_known_devices(data, self.path):
+            return False
+        self.last_updated = data["last_updated"]
+
+        try:
+            if os.path.exists(self.log_path):
+                with open(self.log_path, 'r') as src, open(self.history_path, 'a') as dst:
+                    dst.write(src.read())
+                os.remove(self.log_path)
+        except IOError:
+            return False
+        self._log_size = 0
+        self._compact_due = False
+        return True
+
+    def iter_events(self, mac_address: Optional[str] = None):
+        """Yield archived and current events, optionally for one device only"""
+        mac = normalize_mac(mac_address) if mac_address else None
+        for path in (self.history_path, self.log_path):
+            for event in self._read_log(path):
+                if mac is None or event.get("mac") in (None, mac):
+                    yield event
 
-        if not isinstance(hosts, list):
-            hosts = [hosts]
+    def get(self, mac_address: str) -> Optional[Dict]:
+        return self._devices.get(normalize_mac(mac_address))
 
+    def is_known(self, mac_address: str) -> bool:
+        return normalize_mac(mac_address) in self._devices
+
+    def all(self) -> List[Dict]:
+        return list(self._devices.values())
+
+    def connected(self) -> List[Dict]:
+        return [self._devices[mac] for mac in self._connected]
+
+    def disconnected(self) -> List[Dict]:
+        devices = [self._devices[mac] for mac in self._disconnected]
+        devices.sort(key=lambda x: x.get('last_seen', ''), reverse=True)
+        return devices
+
+    def blocked(self) -> List[Dict]:
+        devices = [self._devices[mac] for mac in self._blocked]
+        devices.sort(key=lambda x: x.get('blocked_at', x.get('last_seen', '')), reverse=True)
+        return devices
+
+    def sync(self, hosts: List[Dict]):
+        """Merge the currently connected hosts into the store as change events"""
+        events = []
         current_macs = set()
-        current_time = datetime.now().isoformat()
 
         for host in hosts:
-            mac = host.get('MacAddress', '').upper()
-            if not mac:
+            mac = normalize_mac(host.get('MacAddress', ''))
+            if not mac or mac in current_macs:
                 continue
 
             current_macs.add(mac)
+            fields = {key: host[key] for key in HOST_FIELDS if key in host}
+            device = self._devices.get(mac)
+
+            if device is None or not device.get('is_connected', False):
+                events.append({"e": "connect", "mac": mac, **fields})
+            elif any(device.get(key) != value for key, value in fields.items()):
+                events.append({"e": "update", "mac": mac, **fields})
+
+        for mac in self._connected - current_macs:
+            events.append({"e": "disconnect", "mac": mac})
+
+        if events:
+            # A single record refreshes last_seen of every connected device
+            events.append({"e": "seen"})
+            self._record(events)
+        else:
+            # Nothing but timestamps changed: apply now, write later
+            now = datetime.now().isoformat()
+            self._apply({"e": "seen", "t": now})
+            self._pending_seen = now
+            self.last_updated = now
+
+    def set_blocked(self, mac_address: str, blocked: bool = True) -> bool:
+        """Set the blocked flag of a known device; returns False if unknown"""
+        mac = normalize_mac(mac_address)
+        if mac not in self._devices:
+            return False
+        self._record([{"e": "block" if blocked else "unblock", "mac": mac}])
+        return True
 
-            existing_device = next(
-                (d for d in known_devices if d.get('MacAddress', '').upper() == mac),
-                None
-            )
-
-            if existing_device:
-                existing_device['HostName'] = host.get('HostName', existing_device.get('HostName', 'Unknown'))
-                existing_device['IpAddress'] = host.get('IpAddress', existing_device.get('IpAddress', 'Unknown'))
-                existing_device['ConnectionType'] = host.get('ConnectionType', existing_device.get('ConnectionType', 'Unknown'))
-                existing_device['is_connected'] = True
-                existing_device['last_seen'] = current_time
-                # Ensure is_blocked field exists
-                if 'is_blocked' not in existing_device:
-                    existing_device['is_blocked'] = False
-            else:
-                known_devices.append({
-                    'MacAddress': mac,
-                    'HostName': host.get('HostName', 'Unknown'),
-                    'IpAddress': host.get('IpAddress', 'Unknown'),
-                    'ConnectionType': host.get('ConnectionType', 'Unknown'),
-                    'is_connected': True,
-                    'is_blocked': False,
-                    'first_seen': current_time,
-                    'last_seen': current_time
-                })
-
-        for device in known_devices:
-            mac = device.get('MacAddress', '').upper()
-            if mac not in current_macs and device.get('is_connected', False):
-                device['is_connected'] = False
-                device['last_disconnected'] = current_time
-                # Ensure is_blocked field exists
-                if 'is_blocked' not in device:
-                    device['is_blocked'] = False
-
-        data["devices"] = known_devices
-        save_known_devices(data)
-
-    except (KeyError, TypeError):
-        pass
+    def set_blocked_many(self, changes: Dict[str, bool]) -> int:
+        """
+        Set the blocked flag of several known devices as one batch of events.
+        Unknown devices and devices already in the wanted state are skipped.
+        Returns:
+            number of devices updated
+        """
+        events = []
+        for mac_address, blocked in changes.items():
+            mac = normalize_mac(mac_address)
+            device = self._devices.get(mac)
+            if device is not None and device.get('is_blocked', False) != blocked:
+                events.append({"e": "block" if blocked else "unblock", "mac": mac})
+        if events:
+            self._record(events)
+        return len(events)
+
+    def clear(self):
+        """Forget every device and its history; the next save() writes an empty snapshot"""
+        self._devices.clear()
+        self._connected.clear()
+        self._disconnected.clear()
+        self._blocked.clear()
+        self._pending.clear()
+        self._pending_seen = None
+        for path in (self.log_path, self.history_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._log_size = 0
+        self._compact_due = True
+
+_store = None
+
+def get_store():
+    """
+    Return the process-wide device store, loading it on first use.
+    The backend is chosen by DEVICE_STORE_BACKEND in config.py; the SQLite
+    backend imports known_devices.json once on first use.
+    """
+    global _store
+    if _store is None:
+        if DEVICE_STORE_BACKEND == "sqlite":
+            from modem.device_db import SQLiteDeviceStore
+            _store = SQLiteDeviceStore(KNOWN_DEVICES_DB, json_path=KNOWN_DEVICES_FILE)
+        else:
+            _store = DeviceStore(KNOWN_DEVICES_FILE)
+        atexit.register(_store.flush)
+    return _store
+
+def flush_devices() -> bool:
+    """Write any coalesced device updates to storage now"""
+    return get_store().flush()
+
+def get_write_stats() -> Dict[str, int]:
+    """Return how many tracker writes were performed and skipped"""
+    return get_store().write_stats()
 
-    return data
+def sync_devices(current_hosts: Optional[Dict]) -> Dict:
+    """
+    Sync known devices with currently connected hosts
+    Returns updated known devices data
+    A successful response with no hosts marks every device disconnected;
+    an error or missing response leaves the store unchanged.
+    """
+    store = get_store()
+    if is_host_list(current_hosts):
+        store.sync(extract_hosts(current_hosts))
+        store.save()
+    return store.to_data()
 
 def get_disconnected_devices() -> List[Dict]:
     """
     Get list of devices that are known but currently disconnected
     Returns list of device dictionaries
     """
-    data = load_known_devices()
-    devices = data.get("devices", [])
-
-    disconnected = [d for d in devices if not d.get('is_connected', False)]
-
-    disconnected.sort(key=lambda x: x.get('last_seen', ''), reverse=True)
-
-    return disconnected
+    return get_store().disconnected()
 
 def get_known_devices() -> List[Dict]:
     """Get all known devices"""
-    data = load_known_devices()
-    return data.get("devices", [])
+    return get_store().all()
 
 def clear_device_history() -> bool:
     """Clear all device history"""
-    data = {
-        "devices": [],
-        "last_updated": datetime.now().isoformat()
-    }
-    return save_known_devices(data)
+    store = get_store()
+    store.clear()
+    return store.save()
 
 def set_device_blocked(mac_address: str, blocked: bool = True) -> bool:
     """
@@ -157,35 +476,31 @@ def set_device_blocked(mac_address: str, blocked: bool = True) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    data = load_known_devices()
-    devices = data.get("devices", [])
-
-    mac_upper = mac_address.upper()
-
-    for device in devices:
-        if device.get('MacAddress', '').upper() == mac_upper:
-            device['is_blocked'] = blocked
-            if blocked:
-                device['blocked_at'] = datetime.now().isoformat()
-            elif 'blocked_at' in device:
-                device.pop('blocked_at', None)
-            return save_known_devices(data)
+    store = get_store()
+    if not store.set_blocked(mac_address, blocked):
+        return False
+    return store.save()
 
-    return False
+def set_devices_blocked(changes: Dict[str, bool]) -> int:
+    """
+    Update the blocked flag of many devices with a single tracker write.
+    Args:
+        changes: dict of MAC address -> True (blocked) or False (unblocked)
+    Returns:
+        number of known devices whose flag changed
+    """
+    store = get_store()
+    updated = store.set_blocked_many(changes)
+    if updated:
+        store.save()
+    return updated
 
 def get_blocked_devices() -> List[Dict]:
     """
     Get list of devices that are currently blocked.
     Returns list of device dictionaries
     """
-    data = load_known_devices()
-    devices = data.get("devices", [])
-
-    blocked = [d for d in devices if d.get('is_blocked', False)]
-
-    blocked.sort(key=lambda x: x.get('blocked_at', x.get('last_seen', '')), reverse=True)
-
-    return blocked
+    return get_store().blocked()
 
 def is_device_known(mac_address: str) -> bool:
     """
@@ -195,9 +510,4 @@ def is_device_known(mac_address: str) -> bool:
     Returns:
         True if device is known, False otherwise
     """
-    data = load_known_devices()
-    devices = data.get("devices", [])
-
-    mac_upper = mac_address.upper()
-
-    return any(d.get('MacAddress', '').upper() == mac_upper for d in devices)
+    return get_store().is_known(mac_address)
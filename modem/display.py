@@ -17,330 +17,453 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+from config import SMS_PAGE_SIZE
 from utils.colors import Colors
+from modem.device_tracker import normalize_mac
 
-def display_device_info(modem):
-    """Display device information"""
-    modem._print_section_header("Device Information")
-    info = modem.get_device_info()
+def _render_device_info(modem, info):
+    """Render device information returned by the modem"""
     if info:
         for key, value in info.items():
             modem._print_key_value(key, value)
     else:
         modem._print_error("No device information available")
 
-def display_connection_status(modem):
-    """Display connection status"""
-    modem._print_section_header("Connection Status")
-    status = modem.get_status()
+def _render_connection_status(modem, status):
+    """Render connection status returned by the modem"""
     if status:
         for key, value in status.items():
             modem._print_key_value(key, value)
     else:
         modem._print_error("No connection status available")
 
+def _render_connected_hosts(modem, hosts):
+    """Render the connected hosts returned by the modem"""
+    if hosts:
+        for key, value in hosts.items():
+            modem._print_key_value(key, value)
+    else:
+        modem._print_info("No connected hosts found")
+
+def _render_sms(modem, sms):
+    """Render SMS messages returned by the modem"""
+    if sms:
+        for key, value in sms.items():
+            modem._print_key_value(key, value)
+    else:
+        modem._print_info("No SMS messages found")
+
+def _render_sms_message(out, number, message):
+    """Render one SmsMessage from modem.iter_sms()"""
+    state = f" {Colors.WARNING}(unread){Colors.ENDC}" if message.unread else ""
+    out.line(f"{Colors.HEADER}[{number}]{Colors.ENDC} {Colors.OKGREEN}{message.phone}{Colors.ENDC}"
+             f" - {message.date}{state}")
+    out.line(f"    {message.content}")
+
+def _ask_sms_quantity(out):
+    """Prompt for the number of SMS messages to show (raises ValueError)"""
+    qty = out.prompt(f"How many SMS messages to show? (default 5): ")
+    return int(qty) if qty.strip() else 5
+
+def display_device_info(modem):
+    """Display device information"""
+    with modem.screen():
+        modem._print_section_header("Device Information")
+        _render_device_info(modem, modem.get_device_info())
+
+def display_connection_status(modem):
+    """Display connection status"""
+    with modem.screen():
+        modem._print_section_header("Connection Status")
+        _render_connection_status(modem, modem.get_status())
+
 def display_connected_hosts(modem):
     """Display connected hosts"""
-    modem._print_section_header("Connected Hosts")
-    try:
-        hosts = modem.get_connected_hosts()
-        if hosts:
-            for key, value in hosts.items():
-                modem._print_key_value(key, value)
-        else:
-            modem._print_info("No connected hosts found")
-    except Exception as e:
-        modem._print_error(f"Could not fetch hosts: {e}")
+    with modem.screen():
+        modem._print_section_header("Connected Hosts")
+        try:
+            _render_connected_hosts(modem, modem.get_connected_hosts())
+        except Exception as e:
+            modem._print_error(f"Could not fetch hosts: {e}")
 
 def display_recent_sms(modem):
     """Display recent SMS messages"""
-    modem._print_section_header("Recent SMS")
-    try:
-        qty = input(f"How many SMS messages to show? (default 5): ")
-        qty = int(qty) if qty.strip() else 5
-        sms = modem.get_sms_list(qty=qty)
-        if sms:
-            for key, value in sms.items():
-                modem._print_key_value(key, value)
-        else:
-            modem._print_info("No SMS messages found")
-    except ValueError:
-        modem._print_error("Please enter a valid number")
-    except Exception as e:
-        modem._print_error(f"Could not fetch SMS: {e}")
+    with modem.screen() as out:
+        modem._print_section_header("Recent SMS")
+        try:
+            qty = _ask_sms_quantity(out)
+            count = 0
+            # A short list needs one page of just that size
+            messages = modem.iter_sms(limit=qty, page_size=min(qty, SMS_PAGE_SIZE))
+            for count, message in enumerate(messages, 1):
+                _render_sms_message(out, count, message)
+            if not count:
+                modem._print_info("No SMS messages found")
+        except ValueError:
+            modem._print_error("Please enter a valid number")
+        except Exception as e:
+            modem._print_error(f"Could not fetch SMS: {e}")
 
 def send_sms_message(modem):
     """Send an SMS message"""
-    modem._print_section_header("Send SMS")
-    try:
-        phone_number = input("Enter phone number: ")
-        message = input("Enter message: ")
-        
-        if phone_number and message:
-            result = modem.send_sms(phone_number, message)
-            if result:
-                modem._print_success("SMS sent successfully!")
+    with modem.screen() as out:
+        modem._print_section_header("Send SMS")
+        try:
+            phone_number = out.prompt("Enter phone number: ")
+            message = out.prompt("Enter message: ")
+
+            if phone_number and message:
+                result = modem.send_sms(phone_number, message)
+                if result:
+                    modem._print_success("SMS sent successfully!")
+                else:
+                    modem._print_error("Failed to send SMS")
             else:
-                modem._print_error("Failed to send SMS")
-        else:
-            modem._print_error("Phone number and message cannot be empty")
-    except Exception as e:
-        modem._print_error(f"Error sending SMS: {e}")
+                modem._print_error("Phone number and message cannot be empty")
+        except Exception as e:
+            modem._print_error(f"Error sending SMS: {e}")
 
 def reboot_modem(modem):
     """Reboot the modem"""
-    modem._print_section_header("Reboot Modem")
-    confirmation = input("⚠️  Are you sure you want to reboot the modem? (y/n): ")
-    if confirmation.lower() == 'y':
-        try:
-            result = modem.reboot()
-            if result:
-                modem._print_success("Modem reboot initiated successfully!")
-            else:
-                modem._print_error("Failed to reboot modem")
-        except Exception as e:
-            modem._print_error(f"Error rebooting modem: {e}")
-    else:
-        modem._print_info("Reboot cancelled")
+    with modem.screen() as out:
+        modem._print_section_header("Reboot Modem")
+        confirmation = out.prompt("⚠️  Are you sure you want to reboot the modem? (y/n): ")
+        if confirmation.lower() == 'y':
+            try:
+                result = modem.reboot()
+                if result:
+                    modem._print_success("Modem reboot initiated successfully!")
+                else:
+                    modem._print_error("Failed to reboot modem")
+            except Exception as e:
+                modem._print_error(f"Error rebooting modem: {e}")
+        else:
+            modem._print_info("Reboot cancelled")
 
 def display_bandwidth_control(modem):
     """Interface for setting host bandwidth limits"""
-    modem._print_section_header("Bandwidth Control")
-    
-    try:
-        hosts_data = modem.get_connected_hosts()
-        if not hosts_data or 'Hosts' not in hosts_data.get('response', {}):
-            modem._print_error("Could not fetch connected hosts")
-            return
+    with modem.screen() as out:
+        modem._print_section_header("Bandwidth Control")
 
-        hosts = hosts_data['response']['Hosts']['Host']
-        if not isinstance(hosts, list):
-            hosts = [hosts]
+        try:
+            hosts_data = modem.get_connected_hosts()
+            if not hosts_data or 'Hosts' not in hosts_data.get('response', {}):
+                modem._print_error("Could not fetch connected hosts")
+                return
 
-        print(f"\nSelect a device to limit:")
-        for i, host in enumerate(hosts, 1):
-            name = host.get('HostName', 'Unknown')
-            mac = host.get('MacAddress', 'Unknown')
-            ip = host.get('IpAddress', 'Unknown')
-            print(f"[{i}] {name} (IP: {ip}, MAC: {mac})")
+            hosts = hosts_data['response']['Hosts']['Host']
+            if not isinstance(hosts, list):
+                hosts = [hosts]
 
-        choice = input(f"\nEnter device number (or 'c' to cancel): ")
-        if choice.lower() == 'c':
-            return
+            out.line(f"\nSelect devices to limit:")
+            for i, host in enumerate(hosts, 1):
+                name = host.get('HostName', 'Unknown')
+                mac = host.get('MacAddress', 'Unknown')
+                ip = host.get('IpAddress', 'Unknown')
+                out.line(f"[{i}] {name} (IP: {ip}, MAC: {mac})")
+
+            choice = out.prompt(f"\nEnter device numbers (e.g. 1,3,5), 'a' for all, or 'c' to cancel: ")
+            if choice.lower() == 'c':
+                return
+
+            if choice.strip().lower() == 'a':
+                selected = hosts
+            else:
+                indexes = [int(part) - 1 for part in choice.split(',') if part.strip()]
+                if not indexes or any(not 0 <= idx < len(hosts) for idx in indexes):
+                    modem._print_error("Invalid selection")
+                    return
+                selected = [hosts[idx] for idx in indexes]
+
+            out.line(f"\nSetting limits for {len(selected)} device(s)")
+            up_limit = out.prompt("Enter Upload Limit (KB/s, 0 for no limit): ")
+            down_limit = out.prompt("Enter Download Limit (KB/s, 0 for no limit): ")
 
-        idx = int(choice) - 1
-        if 0 <= idx < len(hosts):
-            target_host = hosts[idx]
-            mac = target_host['MacAddress']
-            
-            print(f"\nSetting limits for {target_host.get('HostName')}")
-            up_limit = input("Enter Upload Limit (KB/s, 0 for no limit): ")
-            down_limit = input("Enter Download Limit (KB/s, 0 for no limit): ")
-            
             up_limit = int(up_limit) if up_limit.strip() else 0
             down_limit = int(down_limit) if down_limit.strip() else 0
-            
-            result = modem.set_host_limit(mac, up_limit, down_limit)
-            
-            if result and result.get('type') == 'response':
-                modem._print_success("Bandwidth limit command sent successfully!")
+
+            names = {normalize_mac(h['MacAddress']): h.get('HostName', 'Unknown') for h in selected}
+            summary = modem.set_host_limits({mac: (up_limit, down_limit) for mac in names})
+            if summary is None:
+                modem._print_error("Not connected")
+                return
+
+            for mac, outcome in summary.items():
+                label = f"{names.get(mac, 'Unknown')} ({mac})"
+                if outcome["status"] == "applied":
+                    modem._print_success(f"{label}: limit applied")
+                elif outcome["status"] == "unchanged":
+                    modem._print_info(f"{label}: already set, nothing sent")
+                else:
+                    modem._print_error(f"{label}: {outcome.get('error', 'failed')}")
+            if any(o["status"] == "applied" for o in summary.values()):
                 modem._print_info("Note: Effect depends on modem support.")
-            else:
-                error_msg = result.get('error', {}).get('message', 'Unknown error') if result else "No response"
-                modem._print_error(f"Failed to set limit: {error_msg}")
-        else:
-            modem._print_error("Invalid selection")
 
-    except ValueError:
-        modem._print_error("Invalid input. Please enter numbers.")
-    except Exception as e:
-        modem._print_error(f"Error in bandwidth control: {e}")
+        except ValueError:
+            modem._print_error("Invalid input. Please enter numbers.")
+        except Exception as e:
+            modem._print_error(f"Error in bandwidth control: {e}")
 
 def show_all_information(modem):
-    """Display all available information"""
-    display_device_info(modem)
-    display_connection_status(modem)
-    display_connected_hosts(modem)
-    display_recent_sms(modem)
+    """Display all available information, fetching every section concurrently"""
+    with modem.screen() as out:
+        try:
+            qty = _ask_sms_quantity(out)
+        except ValueError:
+            modem._print_error("Please enter a valid number")
+            return
+
+        results = modem.fetch_many({
+            "info": "get_device_info",
+            "status": "get_status",
+            "hosts": "get_connected_hosts",
+            "sms": ("get_sms_list", {"qty": qty}),
+        })
+
+        sections = (
+            ("info", "Device Information", _render_device_info, "Could not fetch device information"),
+            ("status", "Connection Status", _render_connection_status, "Could not fetch connection status"),
+            ("hosts", "Connected Hosts", _render_connected_hosts, "Could not fetch hosts"),
+            ("sms", "Recent SMS", _render_sms, "Could not fetch SMS"),
+        )
+        for name, title, render, error_prefix in sections:
+            modem._print_section_header(title)
+            result = results[name]
+            if result.ok:
+                render(modem, result.value)
+            else:
+                modem._print_error(f"{error_prefix}: {result.error}")
 
 def display_disconnected_devices(modem):
     """Display devices that are known but currently disconnected"""
-    modem._print_section_header("Disconnected Devices")
+    with modem.screen() as out:
+        modem._print_section_header("Disconnected Devices")
 
-    try:
-        modem.sync_device_list()
+        try:
+            modem.sync_device_list()
 
-        disconnected = modem.get_disconnected_devices()
+            disconnected = modem.get_disconnected_devices()
 
-        if not disconnected:
-            modem._print_info("No disconnected devices found")
-            modem._print_info("This list shows devices that have previously connected but are now offline")
-            return
+            if not disconnected:
+                modem._print_info("No disconnected devices found")
+                modem._print_info("This list shows devices that have previously connected but are now offline")
+                return
 
-        print(f"\n{Colors.OKBLUE}Found {len(disconnected)} disconnected device(s):{Colors.ENDC}\n")
+            out.line(f"\n{Colors.OKBLUE}Found {len(disconnected)} disconnected device(s):{Colors.ENDC}\n")
 
-        for i, device in enumerate(disconnected, 1):
-            name = device.get('HostName', 'Unknown')
-            mac = device.get('MacAddress', 'Unknown')
-            ip = device.get('IpAddress', 'Unknown')
-            connection_type = device.get('ConnectionType', 'Unknown')
-            first_seen = device.get('first_seen', 'Unknown')
-            last_seen = device.get('last_seen', 'Unknown')
+            for i, device in enumerate(disconnected, 1):
+                name = device.get('HostName', 'Unknown')
+                mac = device.get('MacAddress', 'Unknown')
+                ip = device.get('IpAddress', 'Unknown')
+                connection_type = device.get('ConnectionType', 'Unknown')
+                first_seen = device.get('first_seen', 'Unknown')
+                last_seen = device.get('last_seen', 'Unknown')
 
-            print(f"{Colors.HEADER}[{i}] {name}{Colors.ENDC}")
-            print(f"   MAC Address: {Colors.OKGREEN}{mac}{Colors.ENDC}")
-            print(f"   IP Address:  {Colors.OKGREEN}{ip}{Colors.ENDC}")
-            print(f"   Type:        {Colors.OKGREEN}{connection_type}{Colors.ENDC}")
-            print(f"   First Seen:  {first_seen}")
-            print(f"   Last Seen:   {last_seen}")
-            print()
+                out.line(f"{Colors.HEADER}[{i}] {name}{Colors.ENDC}")
+                out.line(f"   MAC Address: {Colors.OKGREEN}{mac}{Colors.ENDC}")
+                out.line(f"   IP Address:  {Colors.OKGREEN}{ip}{Colors.ENDC}")
+                out.line(f"   Type:        {Colors.OKGREEN}{connection_type}{Colors.ENDC}")
+                out.line(f"   First Seen:  {first_seen}")
+                out.line(f"   Last Seen:   {last_seen}")
+                out.line()
 
-    except Exception as e:
-        modem._print_error(f"Could not fetch disconnected devices: {e}")
+        except Exception as e:
+            modem._print_error(f"Could not fetch disconnected devices: {e}")
 
 def display_blocked_devices(modem):
     """Display currently blocked devices"""
-    modem._print_section_header("Blocked Devices")
+    with modem.screen() as out:
+        modem._print_section_header("Blocked Devices")
 
-    try:
-        modem.sync_device_list()
+        try:
+            modem.sync_device_list()
 
-        blocked = modem.get_blocked_devices()
+            blocked = modem.get_blocked_devices()
 
-        if not blocked:
-            modem._print_info("No blocked devices found")
-            modem._print_info("Use 'Block a Device' option to add devices to the blocked list")
-            return
+            if not blocked:
+                modem._print_info("No blocked devices found")
+                modem._print_info("Use 'Block a Device' option to add devices to the blocked list")
+                return
 
-        print(f"\n{Colors.OKBLUE}Found {len(blocked)} blocked device(s):{Colors.ENDC}\n")
+            out.line(f"\n{Colors.OKBLUE}Found {len(blocked)} blocked device(s):{Colors.ENDC}\n")
 
-        for i, device in enumerate(blocked, 1):
-            name = device.get('HostName', 'Unknown')
-            mac = device.get('MacAddress', 'Unknown')
-            ip = device.get('IpAddress', 'Unknown')
-            connection_type = device.get('ConnectionType', 'Unknown')
-            blocked_at = device.get('blocked_at', 'Unknown')
-            last_seen = device.get('last_seen', 'Unknown')
+            for i, device in enumerate(blocked, 1):
+                name = device.get('HostName', 'Unknown')
+                mac = device.get('MacAddress', 'Unknown')
+                ip = device.get('IpAddress', 'Unknown')
+                connection_type = device.get('ConnectionType', 'Unknown')
+                blocked_at = device.get('blocked_at', 'Unknown')
+                last_seen = device.get('last_seen', 'Unknown')
 
-            print(f"{Colors.HEADER}[{i}] {name} {Colors.FAIL}(BLOCKED){Colors.ENDC}")
-            print(f"   MAC Address: {Colors.OKGREEN}{mac}{Colors.ENDC}")
-            print(f"   IP Address:  {Colors.OKGREEN}{ip}{Colors.ENDC}")
-            print(f"   Type:        {Colors.OKGREEN}{connection_type}{Colors.ENDC}")
-            print(f"   Blocked At:  {blocked_at}")
-            print(f"   Last Seen:   {last_seen}")
-            print()
+                out.line(f"{Colors.HEADER}[{i}] {name} {Colors.FAIL}(BLOCKED){Colors.ENDC}")
+                out.line(f"   MAC Address: {Colors.OKGREEN}{mac}{Colors.ENDC}")
+                out.line(f"   IP Address:  {Colors.OKGREEN}{ip}{Colors.ENDC}")
+                out.line(f"   Type:        {Colors.OKGREEN}{connection_type}{Colors.ENDC}")
+                out.line(f"   Blocked At:  {blocked_at}")
+                out.line(f"   Last Seen:   {last_seen}")
+                out.line()
 
-    except Exception as e:
-        modem._print_error(f"Could not fetch blocked devices: {e}")
+        except Exception as e:
+            modem._print_error(f"Could not fetch blocked devices: {e}")
 
 def display_block_device_menu(modem):
     """Interactive menu to block a device"""
-    modem._print_section_header("Block a Device")
-
-    try:
-        modem.sync_device_list()
-
-        known_devices = modem.get_known_devices()
+    with modem.screen() as out:
+        modem._print_section_header("Block a Device")
 
-        if not known_devices:
-            modem._print_info("No known devices found")
-            return
+        try:
+            modem.sync_device_list()
 
-        print(f"\n{Colors.OKBLUE}Select a device to block:{Colors.ENDC}\n")
+            known_devices = modem.get_known_devices()
 
-        for i, device in enumerate(known_devices, 1):
-            name = device.get('HostName', 'Unknown')
-            mac = device.get('MacAddress', 'Unknown')
-            ip = device.get('IpAddress', 'Unknown')
-            connection_type = device.get('ConnectionType', 'Unknown')
-            is_blocked = device.get('is_blocked', False)
+            if not known_devices:
+                modem._print_info("No known devices found")
+                return
 
-            status = f"{Colors.FAIL}BLOCKED{Colors.ENDC}" if is_blocked else f"{Colors.OKGREEN}Active{Colors.ENDC}"
-            print(f"{Colors.HEADER}[{i}]{Colors.ENDC} {name}")
-            print(f"   MAC: {Colors.OKGREEN}{mac}{Colors.ENDC} | IP: {Colors.OKGREEN}{ip}{Colors.ENDC} | Type: {connection_type} | Status: {status}")
-            print()
+            out.line(f"\n{Colors.OKBLUE}Select a device to block:{Colors.ENDC}\n")
 
-        choice = input(f"{Colors.OKBLUE}Enter device number (or 'c' to cancel): {Colors.ENDC}")
-        if choice.lower() == 'c':
-            modem._print_info("Blocking cancelled")
-            return
+            blocked = modem.are_devices_blocked(d.get('MacAddress', '') for d in known_devices)
+            for i, device in enumerate(known_devices, 1):
+                name = device.get('HostName', 'Unknown')
+                mac = device.get('MacAddress', 'Unknown')
+                ip = device.get('IpAddress', 'Unknown')
+                connection_type = device.get('ConnectionType', 'Unknown')
+                is_blocked = device.get('is_blocked', False) or blocked.get(normalize_mac(mac), False)
 
-        idx = int(choice) - 1
-        if 0 <= idx < len(known_devices):
-            device = known_devices[idx]
-            mac = device.get('MacAddress', '')
+                status = f"{Colors.FAIL}BLOCKED{Colors.ENDC}" if is_blocked else f"{Colors.OKGREEN}Active{Colors.ENDC}"
+                out.line(f"{Colors.HEADER}[{i}]{Colors.ENDC} {name}")
+                out.line(f"   MAC: {Colors.OKGREEN}{mac}{Colors.ENDC} | IP: {Colors.OKGREEN}{ip}{Colors.ENDC} | Type: {connection_type} | Status: {status}")
+                out.line()
 
-            if device.get('is_blocked', False):
-                modem._print_error(f"Device {device.get('HostName')} is already blocked")
+            choice = out.prompt(f"{Colors.OKBLUE}Enter device number (or 'c' to cancel): {Colors.ENDC}")
+            if choice.lower() == 'c':
+                modem._print_info("Blocking cancelled")
                 return
 
-            confirmation = input(f"\n{Colors.WARNING}⚠️  Block device {device.get('HostName')} ({mac})? (y/n): {Colors.ENDC}")
-            if confirmation.lower() == 'y':
-                if modem.block_device(mac):
-                    modem._print_success(f"Device {device.get('HostName')} blocked successfully")
-                    modem._print_info("The device will lose network access immediately")
+            idx = int(choice) - 1
+            if 0 <= idx < len(known_devices):
+                device = known_devices[idx]
+                mac = device.get('MacAddress', '')
+
+                if device.get('is_blocked', False) or blocked.get(normalize_mac(mac), False):
+                    modem._print_error(f"Device {device.get('HostName')} is already blocked")
+                    return
+
+                confirmation = out.prompt(f"\n{Colors.WARNING}⚠️  Block device {device.get('HostName')} ({mac})? (y/n): {Colors.ENDC}")
+                if confirmation.lower() == 'y':
+                    if modem.block_device(mac):
+                        modem._print_success(f"Device {device.get('HostName')} blocked successfully")
+                        modem._print_info("The device will lose network access immediately")
+                    else:
+                        modem._print_error(f"Failed to block device {device.get('HostName')}")
                 else:
-                    modem._print_error(f"Failed to block device {device.get('HostName')}")
+                    modem._print_info("Blocking cancelled")
             else:
-                modem._print_info("Blocking cancelled")
-        else:
-            modem._print_error("Invalid selection")
+                modem._print_error("Invalid selection")
 
-    except ValueError:
-        modem._print_error("Invalid input. Please enter a number.")
-    except Exception as e:
-        modem._print_error(f"Error blocking device: {e}")
+        except ValueError:
+            modem._print_error("Invalid input. Please enter a number.")
+        except Exception as e:
+            modem._print_error(f"Error blocking device: {e}")
 
 def display_unblock_device_menu(modem):
     """Interactive menu to unblock a device"""
-    modem._print_section_header("Unblock a Device")
+    with modem.screen() as out:
+        modem._print_section_header("Unblock a Device")
 
-    try:
-        modem.sync_device_list()
-
-        blocked = modem.get_blocked_devices()
+        try:
+            modem.sync_device_list()
 
-        if not blocked:
-            modem._print_info("No blocked devices found")
-            return
+            blocked = modem.get_blocked_devices()
 
-        print(f"\n{Colors.OKBLUE}Select a device to unblock:{Colors.ENDC}\n")
+            if not blocked:
+                modem._print_info("No blocked devices found")
+                return
 
-        for i, device in enumerate(blocked, 1):
-            name = device.get('HostName', 'Unknown')
-            mac = device.get('MacAddress', 'Unknown')
-            ip = device.get('IpAddress', 'Unknown')
-            connection_type = device.get('ConnectionType', 'Unknown')
-            blocked_at = device.get('blocked_at', 'Unknown')
+            out.line(f"\n{Colors.OKBLUE}Select a device to unblock:{Colors.ENDC}\n")
 
-            print(f"{Colors.HEADER}[{i}]{Colors.ENDC} {name}")
-            print(f"   MAC: {Colors.OKGREEN}{mac}{Colors.ENDC} | IP: {Colors.OKGREEN}{ip}{Colors.ENDC} | Type: {connection_type}")
-            print(f"   Blocked At: {blocked_at}")
-            print()
+            for i, device in enumerate(blocked, 1):
+                name = device.get('HostName', 'Unknown')
+                mac = device.get('MacAddress', 'Unknown')
+                ip = device.get('IpAddress', 'Unknown')
+                connection_type = device.get('ConnectionType', 'Unknown')
+                blocked_at = device.get('blocked_at', 'Unknown')
 
-        choice = input(f"{Colors.OKBLUE}Enter device number (or 'c' to cancel): {Colors.ENDC}")
-        if choice.lower() == 'c':
-            modem._print_info("Unblocking cancelled")
-            return
+                out.line(f"{Colors.HEADER}[{i}]{Colors.ENDC} {name}")
+                out.line(f"   MAC: {Colors.OKGREEN}{mac}{Colors.ENDC} | IP: {Colors.OKGREEN}{ip}{Colors.ENDC} | Type: {connection_type}")
+                out.line(f"   Blocked At: {blocked_at}")
+                out.line()
 
-        idx = int(choice) - 1
-        if 0 <= idx < len(blocked):
-            device = blocked[idx]
-            mac = device.get('MacAddress', '')
+            choice = out.prompt(f"{Colors.OKBLUE}Enter device number (or 'c' to cancel): {Colors.ENDC}")
+            if choice.lower() == 'c':
+                modem._print_info("Unblocking cancelled")
+                return
 
-            confirmation = input(f"\n{Colors.OKBLUE}Unblock device {device.get('HostName')} ({mac})? (y/n): {Colors.ENDC}")
-            if confirmation.lower() == 'y':
-                if modem.unblock_device(mac):
-                    modem._print_success(f"Device {device.get('HostName')} unblocked successfully")
-                    modem._print_info("The device will regain network access")
+            idx = int(choice) - 1
+            if 0 <= idx < len(blocked):
+                device = blocked[idx]
+                mac = device.get('MacAddress', '')
+
+                confirmation = out.prompt(f"\n{Colors.OKBLUE}Unblock device {device.get('HostName')} ({mac})? (y/n): {Colors.ENDC}")
+                if confirmation.lower() == 'y':
+                    if modem.unblock_device(mac):
+                        modem._print_success(f"Device {device.get('HostName')} unblocked successfully")
+                        modem._print_info("The device will regain network access")
+                    else:
+                        modem._print_error(f"Failed to unblock device {device.get('HostName')}")
                 else:
-                    modem._print_error(f"Failed to unblock device {device.get('HostName')}")
+                    modem._print_info("Unblocking cancelled")
             else:
-                modem._print_info("Unblocking cancelled")
-        else:
-            modem._print_error("Invalid selection")
+                modem._print_error("Invalid selection")
 
-    except ValueError:
-        modem._print_error("Invalid input. Please enter a number.")
-    except Exception as e:
-        modem._print_error(f"Error unblocking device: {e}")
\ No newline at end of file
+        except ValueError:
+            modem._print_error("Invalid input. Please enter a number.")
+        except Exception as e:
+            modem._print_error(f"Error unblocking device: {e}")
+
+def display_sms_archive_sync(modem):
+    """Archive new SMS messages locally and show the newest archived ones"""
+    from modem.sms_archive import get_archive
+
+    with modem.screen() as out:
+        modem._print_section_header("Sync SMS Archive")
+        try:
+            archive = get_archive()
+            added = modem.sync_sms(archive)
+            if added is None:
+                modem._print_error("Not connected to the modem")
+                return
+            for box, count in added.items():
+                modem._print_key_value(box.capitalize(), f"{count} new")
+            modem._print_success(f"{archive.count()} messages archived in {archive.path}")
+
+            recent = archive.recent(limit=5)
+            if recent:
+                out.line(f"\n{Colors.OKBLUE}Latest archived messages:{Colors.ENDC}")
+                for i, message in enumerate(recent, 1):
+                    _render_sms_message(out, i, message)
+        except Exception as e:
+            modem._print_error(f"Could not sync SMS: {e}")
+
+def display_sms_search(modem):
+    """Search the local SMS archive by words, phone number and date range"""
+    from modem.sms_archive import get_archive
+
+    with modem.screen() as out:
+        modem._print_section_header("Search SMS Archive")
+        try:
+            text = out.prompt("Words to find (e.g. otp, bal*; Enter for any): ").strip()
+            phone = out.prompt("From/to number (Enter for any): ").strip() or None
+            since = out.prompt("Since date YYYY-MM-DD (Enter for any): ").strip() or None
+            until = out.prompt("Until date YYYY-MM-DD (Enter for any): ").strip() or None
+
+            archive = get_archive()
+            messages = archive.search(text, phone=phone, since=since, until=until)
+            if not messages:
+                modem._print_info(f"No archived messages match ({archive.count()} archived)")
+                return
+            for i, message in enumerate(messages, 1):
+                _render_sms_message(out, i, message)
+            modem._print_info(f"{len(messages)} newest matches shown")
+        except Exception as e:
+            modem._print_error(f"Could not search SMS: {e}")
@@ -0,0 +1,220 @@
+"""
+Exporter module - Prometheus-style /metrics endpoint for modem status
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from config import EXPORTER_BIND, EXPORTER_PORT, EXPORTER_REFRESH_INTERVAL
+from modem.device_tracker import extract_hosts
+from modem.profiling import LATENCY_BUCKETS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# monitoring/status field -> (metric name, help text)
+STATUS_METRICS = (
+    ("SignalIcon", "huawei_modem_signal_bars", "Signal strength in bars (0-5)."),
+    ("ConnectionStatus", "huawei_modem_connection_status", "Connection status code (901 = connected)."),
+    ("CurrentNetworkType", "huawei_modem_network_type", "Current network type code (19 = LTE)."),
+    ("CurrentWifiUser", "huawei_modem_wifi_users", "Wi-Fi clients reported by the modem."),
+)
+
+# Endpoints refreshed every cycle: name -> (HuaweiModem read method, kwargs)
+REFRESH_CALLS = {
+    "status": ("get_status", {"fresh": True}),
+    "hosts": ("get_connected_hosts", {"fresh": True}),
+}
+
+
+def _to_number(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _format_value(value) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsCollector:
+    """
+    Refreshes modem data on a background schedule and renders the latest
+    values in Prometheus text format. Scrapes only read the cached sample,
+    so the modem sees len(REFRESH_CALLS) requests per interval no matter
+    how many scrapers there are.
+    """
+
+    def __init__(self, modem, interval: float = EXPORTER_REFRESH_INTERVAL):
+        self.modem = modem
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._status: Dict = {}
+        self._host_count: Optional[int] = None
+        self._up = 0
+        self._last_refresh = 0.0
+        self._refreshes = 0
+        self._fetch_seconds = {name: 0.0 for name in REFRESH_CALLS}
+        self._fetch_seconds_sum = {name: 0.0 for name in REFRESH_CALLS}
+        self._fetch_count = {name: 0 for name in REFRESH_CALLS}
+        self._fetch_errors = {name: 0 for name in REFRESH_CALLS}
+
+    def refresh(self):
+        """Fetch status and hosts once and update the sample"""
+        results = self.modem.fetch_many(REFRESH_CALLS)
+        with self._lock:
+            for name, result in results.items():
+                self._fetch_seconds[name] = result.elapsed
+                self._fetch_seconds_sum[name] += result.elapsed
+                self._fetch_count[name] += 1
+                value = result.value if result.ok else None
+                if not result.ok or not value or value.get('type') == 'error':
+                    self._fetch_errors[name] += 1
+
+            status = results["status"]
+            if status.ok and status.value and status.value.get('type') != 'error':
+                self._status = status.value.get('response', {})
+            hosts = results["hosts"]
+            if hosts.ok and hosts.value and hosts.value.get('type') != 'error':
+                self._host_count = len(extract_hosts(hosts.value))
+
+            self._up = int(all(
+                r.ok and r.value and r.value.get('type') != 'error' for r in results.values()
+            ))
+            self._last_refresh = time.time()
+            self._refreshes += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                with self._lock:
+                    self._up = 0
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start refreshing in a daemon thread"""
+        self._thread = threading.Thread(target=self._run, name="metrics-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+
+    def render(self) -> str:
+        """Render the latest sample in Prometheus text exposition format"""
+        host = self.modem.modem_host
+        lines: List[str] = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+
+        with self._lock:
+            metric("huawei_modem_up", "gauge",
+                   "Whether the last refresh of every endpoint succeeded.",
+                   [((("host", host),), self._up)])
+            for field, name, help_text in STATUS_METRICS:
+                value = _to_number(self._status.get(field))
+                if value is not None:
+                    metric(name, "gauge", help_text, [((("host", host),), value)])
+            if self._host_count is not None:
+                metric("huawei_modem_connected_hosts", "gauge",
+                       "Hosts connected to the modem.",
+                       [((("host", host),), self._host_count)])
+
+            endpoints = sorted(REFRESH_CALLS)
+            metric("huawei_exporter_fetch_duration_seconds", "gauge",
+                   "Duration of the last fetch per endpoint.",
+                   [((("host", host), ("endpoint", e)), self._fetch_seconds[e]) for e in endpoints])
+            metric("huawei_exporter_fetch_seconds_total", "counter",
+                   "Total time spent fetching per endpoint.",
+                   [((("host", host), ("endpoint", e)), self._fetch_seconds_sum[e]) for e in endpoints])
+            metric("huawei_exporter_fetches_total", "counter",
+                   "Fetches attempted per endpoint.",
+                   [((("host", host), ("endpoint", e)), self._fetch_count[e]) for e in endpoints])
+            metric("huawei_exporter_fetch_errors_total", "counter",
+                   "Failed fetches per endpoint.",
+                   [((("host", host), ("endpoint", e)), self._fetch_errors[e]) for e in endpoints])
+            metric("huawei_exporter_last_refresh_timestamp_seconds", "gauge",
+                   "Unix time of the last refresh.",
+                   [((("host", host),), self._last_refresh)])
+
+        histograms = self.modem.recorder.histograms()
+        if histograms:
+            name = "huawei_modem_request_duration_seconds"
+            lines.append(f"# HELP {name} Modem API request latency per endpoint.")
+            lines.append(f"# TYPE {name} histogram")
+            bounds = [_format_value(b) for b in LATENCY_BUCKETS] + ["+Inf"]
+            for endpoint, cumulative, total, count in histograms:
+                labels = f'host="{_escape_label(host)}",endpoint="{_escape_label(endpoint)}"'
+                for bound, n in zip(bounds, cumulative):
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {n}')
+                lines.append(f"{name}_sum{{{labels}}} {_format_value(total)}")
+                lines.append(f"{name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _make_handler(collector: MetricsCollector):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != "/metrics":
+                self.send_error(404, "Only /metrics is served")
+                return
+            body = collector.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def serve_metrics(modem, port: int = EXPORTER_PORT, bind: str = EXPORTER_BIND,
+                  interval: float = EXPORTER_REFRESH_INTERVAL):
+    """Serve /metrics until interrupted, refreshing modem data every interval seconds"""
+    collector = MetricsCollector(modem, interval=interval)
+    collector.start()
+    server = ThreadingHTTPServer((bind, port), _make_handler(collector))
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        collector.stop()
+        modem.close()
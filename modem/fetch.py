@@ -0,0 +1,74 @@
+"""
+Fetch module - Concurrent execution of independent modem read calls
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class FetchResult:
+    """Outcome of a single call run by fetch_concurrently"""
+
+    __slots__ = ("name", "value", "error", "elapsed")
+
+    def __init__(self, name: str, value: Any = None,
+                 error: Optional[Exception] = None, elapsed: float = 0.0):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"FetchResult({self.name!r}, {state}, {self.elapsed:.3f}s)"
+
+
+def _timed_call(name: str, func: Callable[[], Any]) -> FetchResult:
+    """Run one call, capturing its result or exception and duration"""
+    start = time.perf_counter()
+    try:
+        value = func()
+        return FetchResult(name, value=value, elapsed=time.perf_counter() - start)
+    except Exception as e:
+        return FetchResult(name, error=e, elapsed=time.perf_counter() - start)
+
+
+def fetch_concurrently(calls: Dict[str, Callable[[], Any]],
+                       max_workers: Optional[int] = None) -> Dict[str, FetchResult]:
+    """
+    Run independent zero-argument calls in parallel.
+    Args:
+        calls: ordered mapping of result name -> callable
+        max_workers: thread pool size (defaults to one thread per call)
+    Returns:
+        dict of name -> FetchResult, in the same order as calls.
+        A failing call records its exception without affecting the others.
+    """
+    if not calls:
+        return {}
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = max_workers or len(calls)
+    with ThreadPoolExecutor(max_workers=min(workers, len(calls))) as pool:
+        futures = {name: pool.submit(_timed_call, name, func) for name, func in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
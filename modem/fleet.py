@@ -0,0 +1,178 @@
+"""
+Fleet module - Run one read operation across many modems in parallel
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Dict, List
+
+from modem import HuaweiModem
+from utils.colors import Colors
+from utils.render import Renderer
+from config import MODEM_USER, FLEET_MAX_WORKERS, FLEET_TIMEOUT
+
+# Operation name -> HuaweiModem read method
+FLEET_OPERATIONS = {
+    "status": "get_status",
+    "hosts": "get_connected_hosts",
+    "info": "get_device_info",
+    "sms-count": "get_sms_count",
+}
+
+
+def load_inventory(path: str) -> List[Dict]:
+    """
+    Load a fleet inventory: a JSON list of
+    {"host": ..., "password": ..., "user": ... (optional), "name": ... (optional)}
+    Raises ValueError on a malformed inventory.
+    """
+    with open(path, 'r') as f:
+        entries = json.load(f)
+
+    if not isinstance(entries, list):
+        raise ValueError("Inventory must be a JSON list of modems")
+
+    inventory = []
+    for i, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or not entry.get("host") or "password" not in entry:
+            raise ValueError(f"Inventory entry {i} needs at least 'host' and 'password'")
+        inventory.append({
+            "name": entry.get("name", entry["host"]),
+            "host": entry["host"],
+            "user": entry.get("user", MODEM_USER),
+            "password": entry["password"],
+        })
+    return inventory
+
+
+def summarize(operation: str, result) -> str:
+    """One-line summary of an operation result for the fleet table"""
+    response = result.get('response', {}) if isinstance(result, dict) else {}
+    if not response:
+        return str(result)
+
+    if operation == "status":
+        return "network={} signal={}/5 status={}".format(
+            response.get('CurrentNetworkType', '?'),
+            response.get('SignalIcon', '?'),
+            response.get('ConnectionStatus', '?'),
+        )
+    if operation == "hosts":
+        hosts = (response.get('Hosts') or {}).get('Host', [])
+        if not isinstance(hosts, list):
+            hosts = [hosts]
+        return f"{len(hosts)} host(s)"
+    if operation == "info":
+        return "{} ({})".format(response.get('DeviceName', '?'), response.get('SoftwareVersion', '?'))
+    if operation == "sms-count":
+        return "inbox={} unread={}".format(response.get('LocalInbox', '?'), response.get('LocalUnread', '?'))
+    return str(response)
+
+
+def _run_one(entry: Dict, operation: str) -> Dict:
+    """Log into one modem and run the operation, timing both steps"""
+    outcome = {"name": entry["name"], "host": entry["host"], "ok": False}
+    modem = HuaweiModem(entry["user"], entry["password"], entry["host"])
+    start = time.perf_counter()
+    try:
+        modem.login()
+        logged_in = time.perf_counter()
+        outcome["login_ms"] = round((logged_in - start) * 1000, 1)
+
+        result = getattr(modem, FLEET_OPERATIONS[operation])()
+        outcome["latency_ms"] = round((time.perf_counter() - logged_in) * 1000, 1)
+        if isinstance(result, dict) and result.get('type') == 'error':
+            outcome["error"] = result.get('error', {}).get('message', 'Unknown error')
+        else:
+            outcome["ok"] = True
+            outcome["result"] = result
+    except Exception as e:
+        outcome["error"] = str(e) or e.__class__.__name__
+    finally:
+        outcome["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        modem.close()
+    return outcome
+
+
+def run_fleet(inventory: List[Dict], operation: str,
+              max_workers: int = FLEET_MAX_WORKERS, timeout: float = FLEET_TIMEOUT) -> List[Dict]:
+    """
+    Run a read operation on every modem of the inventory concurrently.
+    A bounded pool of daemon worker threads pulls modems from a queue, so a
+    hung modem only ties up its own worker. Modems that have not finished
+    by the deadline are reported as timed out.
+    Returns:
+        one result dict per inventory entry, in inventory order
+    """
+    if operation not in FLEET_OPERATIONS:
+        raise ValueError(f"Unknown fleet operation: {operation}")
+
+    jobs = queue.Queue()
+    for index, entry in enumerate(inventory):
+        jobs.put((index, entry))
+    results = [None] * len(inventory)
+
+    def worker():
+        while True:
+            try:
+                index, entry = jobs.get_nowait()
+            except queue.Empty:
+                return
+            results[index] = _run_one(entry, operation)
+
+    threads = [
+        threading.Thread(target=worker, name=f"fleet-{i}", daemon=True)
+        for i in range(min(max_workers, len(inventory)))
+    ]
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(deadline - time.monotonic(), 0))
+
+    for index, entry in enumerate(inventory):
+        if results[index] is None:
+            results[index] = {
+                "name": entry["name"], "host": entry["host"], "ok": False,
+                "error": f"timed out after {timeout:g}s",
+            }
+    return results
+
+
+def print_fleet_results(results: List[Dict], operation: str, as_json: bool = False):
+    """Print fleet results as a colored table or as one JSON document"""
+    if as_json:
+        print(json.dumps({"operation": operation, "modems": results}, indent=2, default=str))
+        return
+
+    ok_count = sum(1 for r in results if r["ok"])
+    name_width = max([len(r["name"]) for r in results] + [4])
+    host_width = max([len(r["host"]) for r in results] + [4])
+    with Renderer() as out:
+        out.line(f"\n{Colors.HEADER}{Colors.BOLD}  Fleet: {operation} ({ok_count}/{len(results)} ok)  {Colors.ENDC}")
+        out.line(f"{Colors.OKBLUE}{'NAME':<{name_width}}  {'HOST':<{host_width}}  {'LOGIN':>8}  {'LATENCY':>8}  RESULT{Colors.ENDC}")
+        for r in results:
+            login = f"{r['login_ms']:.0f}ms" if "login_ms" in r else "-"
+            latency = f"{r['latency_ms']:.0f}ms" if "latency_ms" in r else "-"
+            if r["ok"]:
+                detail = f"{Colors.OKGREEN}{summarize(operation, r['result'])}{Colors.ENDC}"
+            else:
+                detail = f"{Colors.FAIL}{r.get('error', 'failed')}{Colors.ENDC}"
+            out.line(f"{r['name']:<{name_width}}  {r['host']:<{host_width}}  {login:>8}  {latency:>8}  {detail}")
@@ -0,0 +1,186 @@
+"""
+MAC Filter module - Batched block/unblock through the WLAN MAC filter
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from modem.device_tracker import normalize_mac, set_devices_blocked
+
+MAC_FILTER_ENDPOINT = "wlan/multi-macfilter-settings"
+
+# WifiMacFilterStatus values
+FILTER_DISABLED = "0"
+FILTER_ALLOW = "1"
+FILTER_DENY = "2"
+
+# Slots per SSID when the modem does not report them
+DEFAULT_FILTER_SLOTS = 10
+
+_SLOT = re.compile(r'^WifiMacFilterMac(\d+)$')
+
+
+def _ssid_entries(filter_data) -> List[Dict]:
+    """Return the Ssid entries of a multi-macfilter-settings response"""
+    if not isinstance(filter_data, dict) or filter_data.get('type') == 'error':
+        return []
+    ssids = (filter_data.get('response') or {}).get('Ssids') or {}
+    entries = ssids.get('Ssid', []) if isinstance(ssids, dict) else []
+    if isinstance(entries, dict):
+        entries = [entries]
+    return [e for e in entries if isinstance(e, dict)]
+
+
+def _slot_macs(entry: Dict) -> List[str]:
+    """MACs filled in on one SSID, in slot order"""
+    slots = sorted((int(m.group(1)), value) for key, value in entry.items()
+                   if (m := _SLOT.match(key)))
+    return [normalize_mac(value) for _, value in slots if isinstance(value, str) and value.strip()]
+
+
+def parse_blocked_macs(filter_data) -> Set[str]:
+    """
+    Normalized MACs blocked by the filter: the union of the lists of every
+    SSID in deny mode. SSIDs with the filter off or in allow mode block
+    nothing by list.
+    """
+    blocked: Set[str] = set()
+    for entry in _ssid_entries(filter_data):
+        if str(entry.get('WifiMacFilterStatus', FILTER_DISABLED)) == FILTER_DENY:
+            blocked.update(_slot_macs(entry))
+    return blocked
+
+
+class MacFilterManager:
+    """
+    Applies many block/unblock operations with one read and one write.
+    The filter is read once, operations are applied to an in-memory deny
+    set and commit() writes the merged list back to every SSID in a single
+    request, so blocking one device never drops the others. The blocked
+    flags in the device tracker are then updated in one batch.
+
+        with modem.mac_filter() as mac_filter:
+            mac_filter.block("AA:BB:CC:DD:EE:01")
+            mac_filter.unblock("AA:BB:CC:DD:EE:02")
+    """
+
+    def __init__(self, modem):
+        self.modem = modem
+        self._entries: List[Dict] = []
+        self._loaded: Set[str] = set()
+        self.blocked: Set[str] = set()
+        self._changes: Dict[str, bool] = {}
+        self.slots = DEFAULT_FILTER_SLOTS
+
+    def load(self):
+        """Read the current filter, discarding operations not yet committed"""
+        filter_data = self.modem.get_mac_filter_settings(fresh=True)
+        if not filter_data or filter_data.get('type') == 'error':
+            message = filter_data.get('error', {}).get('message') if filter_data else None
+            raise RuntimeError(f"Could not read MAC filter: {message or 'no response'}")
+
+        self._entries = _ssid_entries(filter_data)
+        if not self._entries:
+            raise RuntimeError("MAC filter response has no SSID entries")
+        if any(str(e.get('WifiMacFilterStatus')) == FILTER_ALLOW for e in self._entries):
+            raise RuntimeError("MAC filter is in allow-list mode; blocking by list is not supported")
+
+        slot_counts = [sum(1 for key in e if _SLOT.match(key)) for e in self._entries]
+        self.slots = min(slot_counts) or DEFAULT_FILTER_SLOTS
+        self._loaded = parse_blocked_macs(filter_data)
+        self.blocked = set(self._loaded)
+        self._changes = {}
+        return self
+
+    def _validated(self, mac_address: str) -> str:
+        mac = normalize_mac(mac_address)
+        if not self.modem._is_valid_mac(mac):
+            raise ValueError(f"Invalid MAC address format: {mac_address}")
+        return mac
+
+    def block(self, mac_address: str):
+        mac = self._validated(mac_address)
+        self.blocked.add(mac)
+        self._changes[mac] = True
+
+    def unblock(self, mac_address: str):
+        mac = self._validated(mac_address)
+        self.blocked.discard(mac)
+        self._changes[mac] = False
+
+    def apply(self, block: Iterable[str] = (), unblock: Iterable[str] = ()):
+        """Queue several operations; unblocks are applied after blocks"""
+        for mac in block:
+            self.block(mac)
+        for mac in unblock:
+            self.unblock(mac)
+
+    @property
+    def dirty(self) -> bool:
+        return self.blocked != self._loaded
+
+    def _build_xml(self) -> str:
+        macs = sorted(self.blocked)
+        status = FILTER_DENY if macs else FILTER_DISABLED
+        ssids = []
+        for entry in self._entries:
+            fields = [f"<Index>{entry.get('Index', 0)}</Index>",
+                      f"<WifiMacFilterStatus>{status}</WifiMacFilterStatus>"]
+            for slot in range(self.slots):
+                mac = macs[slot] if slot < len(macs) else ""
+                fields.append(f"<WifiMacFilterMac{slot}>{mac}</WifiMacFilterMac{slot}>")
+            ssids.append("<Ssid>{}</Ssid>".format("".join(fields)))
+        return """<?xml version="1.0" encoding="UTF-8"?>
+        <request><Ssids>{}</Ssids></request>""".format("".join(ssids))
+
+    def commit(self) -> Optional[Dict]:
+        """
+        Write the merged deny list in one request (nothing is sent when it
+        is unchanged) and sync the tracker's blocked flags.
+        Returns:
+            the modem response, or None if nothing had to be written
+        Raises:
+            ValueError if the list exceeds the modem's filter slots,
+            RuntimeError if the modem rejects the write
+        """
+        if not self._entries:
+            self.load()
+        if len(self.blocked) > self.slots:
+            raise ValueError(f"MAC filter holds at most {self.slots} devices, "
+                             f"{len(self.blocked)} requested")
+
+        result = None
+        if self.dirty:
+            result = self.modem._send_custom_xml(MAC_FILTER_ENDPOINT, self._build_xml())
+            self.modem.invalidate_cache("mac_filter", "hosts")
+            if not result or result.get('type') == 'error':
+                message = result.get('error', {}).get('message') if result else None
+                raise RuntimeError(f"MAC filter update failed: {message or 'no response'}")
+            self._loaded = set(self.blocked)
+
+        set_devices_blocked(self._changes)
+        self._changes = {}
+        return result
+
+    def __enter__(self):
+        return self.load()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        return False
@@ -18,36 +18,36 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 from utils.colors import Colors
+from utils.render import Renderer
 from config import MENU_OPTIONS
 
 def show_menu():
     """Display the interactive menu"""
-    print(f"\n{Colors.HEADER}{Colors.BOLD}=== HUAWEI MODEM CONTROL MENU ==={Colors.ENDC}")
-    
-    for option_num, option_text in MENU_OPTIONS.items():
-        if option_num == 0:  # Exit option
-            print(f"{Colors.OKBLUE}{option_num}.{Colors.ENDC} {option_text}")
-        else:
-            print(f"{Colors.OKBLUE}{option_num}.{Colors.ENDC} {option_text}")
-    
-    print(f"{Colors.HEADER}==============================={Colors.ENDC}")
+    with Renderer() as out:
+        out.line(f"\n{Colors.HEADER}{Colors.BOLD}=== HUAWEI MODEM CONTROL MENU ==={Colors.ENDC}")
+
+        for option_num, option_text in MENU_OPTIONS.items():
+            out.line(f"{Colors.OKBLUE}{option_num}.{Colors.ENDC} {option_text}")
+
+        out.line(f"{Colors.HEADER}==============================={Colors.ENDC}")
 
 def get_user_choice():
     """Get and validate user input"""
     max_option = max(MENU_OPTIONS.keys())
-    
+    out = Renderer()
+
     while True:
         try:
-            choice = input(f"{Colors.OKGREEN}Enter your choice (0-{max_option}): {Colors.ENDC}")
+            choice = out.prompt(f"{Colors.OKGREEN}Enter your choice (0-{max_option}): {Colors.ENDC}")
             choice = int(choice)
             if 0 <= choice <= max_option:
                 return choice
             else:
-                print(f"{Colors.FAIL}❌ Please enter a number between 0 and {max_option}{Colors.ENDC}")
+                out.error(f"Please enter a number between 0 and {max_option}")
         except ValueError:
-            print(f"{Colors.FAIL}❌ Please enter a valid number{Colors.ENDC}")
+            out.error("Please enter a valid number")
 
 def get_continue_choice():
     """Ask user if they want to continue"""
-    continue_choice = input(f"\n{Colors.OKBLUE}Press Enter to continue or 'q' to quit...{Colors.ENDC}")
-    return continue_choice.lower() == 'q'
\ No newline at end of file
+    continue_choice = Renderer().prompt(f"\n{Colors.OKBLUE}Press Enter to continue or 'q' to quit...{Colors.ENDC}")
+    return continue_choice.lower() == 'q'
@@ -0,0 +1,139 @@
+"""
+Profiling module - Per-endpoint latency histograms for modem API calls
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Tuple
+
+# Histogram bucket upper bounds in seconds (the last bucket is unbounded)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class EndpointHistogram:
+    """Fixed-bucket latency histogram plus byte and outcome counters for one endpoint"""
+
+    __slots__ = ("buckets", "count", "total", "max", "bytes_out", "bytes_in", "outcomes")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.outcomes: Dict[str, int] = {}
+
+    def add(self, seconds: float, bytes_out: int, bytes_in: int, outcome: str):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.bytes_out += bytes_out
+        self.bytes_in += bytes_in
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """Estimate a percentile (0-1) by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "errors": self.count - self.outcomes.get("ok", 0),
+            "mean_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 1),
+            "p95_ms": round(self.percentile(0.95) * 1000, 1),
+            "max_ms": round(self.max * 1000, 1),
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "outcomes": dict(self.outcomes),
+        }
+
+
+class LatencyRecorder:
+    """
+    Thread-safe collection of EndpointHistograms keyed by endpoint.
+    record() is the hook called once per outbound request; it only takes
+    a lock and bumps a few counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointHistogram] = {}
+
+    def record(self, endpoint: str, seconds: float, bytes_out: int = 0,
+               bytes_in: int = 0, outcome: str = "ok"):
+        with self._lock:
+            histogram = self._endpoints.get(endpoint)
+            if histogram is None:
+                histogram = self._endpoints[endpoint] = EndpointHistogram()
+            histogram.add(seconds, bytes_out, bytes_in, outcome)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-endpoint count, errors, mean/p50/p95/max in ms, bytes and outcomes"""
+        with self._lock:
+            return {endpoint: h.summary() for endpoint, h in sorted(self._endpoints.items())}
+
+    def histograms(self) -> List[Tuple[str, List[int], float, int]]:
+        """(endpoint, cumulative bucket counts, sum of seconds, count) for exporters"""
+        with self._lock:
+            result = []
+            for endpoint, h in sorted(self._endpoints.items()):
+                cumulative, running = [], 0
+                for n in h.buckets:
+                    running += n
+                    cumulative.append(running)
+                result.append((endpoint, cumulative, h.total, h.count))
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def format_summary(self) -> str:
+        """Plain-text latency table, slowest p95 first"""
+        rows = sorted(self.summary().items(), key=lambda item: item[1]["p95_ms"], reverse=True)
+        if not rows:
+            return "No modem requests were made."
+        width = max(len(endpoint) for endpoint, _ in rows + [("ENDPOINT", None)])
+        lines = [f"{'ENDPOINT':<{width}}  {'COUNT':>6}  {'ERR':>4}  {'P50':>9}  {'P95':>9}  {'MAX':>9}  {'BYTES IN':>9}"]
+        for endpoint, s in rows:
+            lines.append(
+                f"{endpoint:<{width}}  {s['count']:>6}  {s['errors']:>4}  "
+                f"{s['p50_ms']:>7.1f}ms  {s['p95_ms']:>7.1f}ms  {s['max_ms']:>7.1f}ms  {s['bytes_in']:>9}"
+            )
+        return "\n".join(lines)
+
+
+_recorder = LatencyRecorder()
+
+
+def get_recorder() -> LatencyRecorder:
+    """The process-wide recorder shared by every HuaweiModem by default"""
+    return _recorder
@@ -0,0 +1,80 @@
+"""
+QoS module - Parse and diff per-host bandwidth limits
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from typing import Dict, Iterator, Optional, Tuple
+
+from modem.device_tracker import normalize_mac
+
+Limits = Tuple[int, int]  # (upload, download) in KB/s, 0 = no limit
+
+
+def _walk(node) -> Iterator[Dict]:
+    """Yield every dict nested anywhere in a parsed XML response"""
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_qos_limits(qos_data) -> Optional[Dict[str, Limits]]:
+    """
+    Extract current limits from a qos/qos-setup response.
+    Firmwares nest the entries differently, so any element carrying a Mac
+    with UploadRate/DownloadRate is taken as one host entry; disabled
+    entries (Status 0) count as no limit.
+    Returns:
+        dict of normalized MAC -> (upload, download), or None if the
+        response is missing or an error
+    """
+    if not isinstance(qos_data, dict) or qos_data.get('type') == 'error':
+        return None
+    limits: Dict[str, Limits] = {}
+    for entry in _walk(qos_data.get('response')):
+        mac = entry.get('Mac') or entry.get('MacAddress')
+        if not isinstance(mac, str) or not mac:
+            continue
+        if str(entry.get('Status', '1')) == '0':
+            limits[normalize_mac(mac)] = (0, 0)
+        else:
+            limits[normalize_mac(mac)] = (_to_int(entry.get('UploadRate')),
+                                          _to_int(entry.get('DownloadRate')))
+    return limits
+
+
+def diff_limits(current: Optional[Dict[str, Limits]],
+                policy: Dict[str, Limits]) -> Dict[str, Limits]:
+    """
+    Return the policy entries that differ from the current state. A host
+    without a current entry is unlimited, so a (0, 0) policy for it is a
+    no-op. With current=None (state unknown) every entry is returned.
+    """
+    if current is None:
+        return dict(policy)
+    return {mac: limits for mac, limits in policy.items()
+            if current.get(mac, (0, 0)) != limits}
@@ -0,0 +1,179 @@
+"""
+Resilience module - Error classification, retry backoff and circuit breaker
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from config import BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+
+# Error codes meaning the session or verification token is no longer valid:
+# 100003 no rights (logged out), 125001 wrong token, 125002 wrong session,
+# 125003 wrong session token
+SESSION_ERROR_CODES = frozenset({"100003", "125001", "125002", "125003"})
+
+# Error codes worth retrying: 100004 system busy, 100005 unknown transient error
+TRANSIENT_ERROR_CODES = frozenset({"100004", "100005"})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the modem while the circuit breaker is open"""
+
+
+def error_code(result) -> Optional[str]:
+    """The error code of an API error response, or None for anything else"""
+    if isinstance(result, dict) and result.get('type') == 'error':
+        error = result.get('error') or {}
+        code = error.get('code') if isinstance(error, dict) else None
+        return str(code) if code is not None else ""
+    return None
+
+
+def is_session_error(result) -> bool:
+    return error_code(result) in SESSION_ERROR_CODES
+
+
+def is_transient_error(result) -> bool:
+    return error_code(result) in TRANSIENT_ERROR_CODES
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated failures.
+    After failure_threshold consecutive failures the circuit opens and
+    allow() refuses calls for reset_timeout seconds. Then a single trial
+    call is let through (half-open): success closes the circuit, failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to the modem now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def retry_after(self) -> float:
+        """Seconds until the open circuit lets a trial call through"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def as_dict(self) -> Dict:
+        state = self.state
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._failures,
+                    "times_opened": self.times_opened}
+
+
+class TokenBucket:
+    """
+    Rate limiter: tokens refill at rate per second up to capacity, and
+    acquire() waits until a token is available, so calls average rate per
+    second with bursts of at most capacity.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        # Caller holds the lock
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available right now"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
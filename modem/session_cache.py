@@ -0,0 +1,101 @@
+"""
+Session Cache module - Persist authenticated modem sessions between runs
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from config import SESSION_CACHE_DIR, SESSION_CACHE_TTL
+
+
+def _cache_path(modem_host: str, username: str) -> str:
+    """Return the cache file path for a host/user pair"""
+    key = hashlib.sha256(f"{modem_host}\0{username}".encode("utf-8")).hexdigest()[:24]
+    return os.path.join(SESSION_CACHE_DIR, f"session-{key}.json")
+
+
+def save_session(ctx, modem_host: str, username: str, ttl: float = SESSION_CACHE_TTL) -> bool:
+    """
+    Save the session cookie and tokens of an authenticated ctx.
+    The file is only readable by the current user.
+    Returns:
+        True if successful, False otherwise
+    """
+    if not ctx or not ctx.session_id:
+        return False
+
+    data = {
+        "modem_host": modem_host,
+        "username": username,
+        "session_id": ctx.session_id,
+        "login_token": ctx.login_token,
+        "tokens": list(ctx.tokens),
+        "expires_at": time.time() + ttl,
+    }
+    path = _cache_path(modem_host, username)
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(SESSION_CACHE_DIR, mode=0o700, exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        return False
+
+
+def load_session(modem_host: str, username: str) -> Optional[object]:
+    """
+    Load a cached session for a host/user pair.
+    Returns:
+        A huaweisms ApiCtx with the cached cookie and tokens,
+        or None if nothing usable is cached
+    """
+    path = _cache_path(modem_host, username)
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if (data.get("modem_host") != modem_host or data.get("username") != username
+            or data.get("expires_at", 0) <= time.time() or not data.get("session_id")):
+        clear_session(modem_host, username)
+        return None
+
+    import huaweisms.api.common
+    ctx = huaweisms.api.common.ApiCtx(modem_host=modem_host)
+    ctx.session_id = data["session_id"]
+    ctx.login_token = data.get("login_token")
+    ctx.tokens = list(data.get("tokens", []))
+    ctx.logged_in = True
+    return ctx
+
+
+def clear_session(modem_host: str, username: str) -> bool:
+    """Remove the cached session for a host/user pair"""
+    try:
+        os.remove(_cache_path(modem_host, username))
+        return True
+    except OSError:
+        return False
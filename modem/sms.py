@@ -0,0 +1,139 @@
+"""
+SMS module - Normalized messages and paginated iteration over SMS boxes
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from config import SMS_PAGE_SIZE
+
+# BoxType values of sms/sms-list
+INBOX = 1
+OUTBOX = 2
+BOX_NAMES = {INBOX: "inbox", OUTBOX: "outbox"}
+
+# Smstat values
+SMS_UNREAD = 0
+SMS_READ = 1
+
+
+def _to_int(value, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class SmsMessage:
+    """One SMS message from an sms/sms-list page, with typed fields"""
+
+    __slots__ = ("index", "phone", "content", "date", "box", "status", "sms_type")
+
+    def __init__(self, index: int, phone: str, content: str, date: str,
+                 box: int = INBOX, status: int = SMS_READ, sms_type: int = 1):
+        self.index = index
+        self.phone = phone
+        self.content = content
+        self.date = date
+        self.box = box
+        self.status = status
+        self.sms_type = sms_type
+
+    @classmethod
+    def from_response(cls, message: Dict, box: int) -> "SmsMessage":
+        return cls(
+            index=_to_int(message.get('Index')),
+            phone=message.get('Phone') or "",
+            content=message.get('Content') or "",
+            date=message.get('Date') or "",
+            box=box,
+            status=_to_int(message.get('Smstat'), SMS_READ),
+            sms_type=_to_int(message.get('SmsType'), 1),
+        )
+
+    @property
+    def unread(self) -> bool:
+        return self.box == INBOX and self.status == SMS_UNREAD
+
+    def as_dict(self) -> Dict:
+        return {
+            "index": self.index, "phone": self.phone, "content": self.content,
+            "date": self.date, "box": BOX_NAMES.get(self.box, str(self.box)),
+            "status": self.status, "unread": self.unread,
+        }
+
+    def __repr__(self):
+        return f"SmsMessage({self.index}, {self.phone!r}, {self.date!r})"
+
+
+def parse_sms_page(response, box: int) -> List[SmsMessage]:
+    """
+    Messages of one sms/sms-list response. Raises RuntimeError on an API
+    error so a failed page is never mistaken for the end of the box.
+    """
+    if not isinstance(response, dict):
+        raise RuntimeError("No response from the modem")
+    if response.get('type') == 'error':
+        raise RuntimeError("SMS list failed: {}".format(response.get('error')))
+    messages = ((response.get('response') or {}).get('Messages') or {}).get('Message') or []
+    if isinstance(messages, dict):
+        messages = [messages]
+    return [SmsMessage.from_response(m, box) for m in messages if isinstance(m, dict)]
+
+
+def iter_messages(fetch_page: Callable[[int, int, int], Dict],
+                  box_types: Iterable[int] = (INBOX,), page_size: int = SMS_PAGE_SIZE,
+                  read_state: Optional[str] = None, limit: Optional[int] = None,
+                  stop: Optional[Callable[[SmsMessage], bool]] = None) -> Iterator[SmsMessage]:
+    """
+    Yield messages newest first, one page request at a time.
+    Args:
+        fetch_page: fetch_page(page, page_size, box_type) -> sms-list response
+        box_types: boxes to read, in order (INBOX, OUTBOX)
+        page_size: messages per request
+        read_state: "unread", "read" or None for all (filtered locally,
+                    the firmware cannot filter by read state)
+        limit: stop after yielding this many messages
+        stop: stop everything at the first message for which stop(message)
+              is true (that message is not yielded), e.g. to end at an index
+              that was already seen
+    Only one page is held in memory at a time, so the whole box can be
+    processed in constant memory; stopping early skips the remaining pages.
+    """
+    if read_state not in (None, "read", "unread"):
+        raise ValueError(f"Unknown read state: {read_state}")
+    if limit is not None and limit <= 0:
+        return
+    yielded = 0
+    for box in box_types:
+        page = 1
+        while True:
+            messages = parse_sms_page(fetch_page(page, page_size, box), box)
+            for message in messages:
+                if stop is not None and stop(message):
+                    return
+                if read_state == "unread" and not message.unread:
+                    continue
+                if read_state == "read" and message.unread:
+                    continue
+                yield message
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+            if len(messages) < page_size:
+                break
+            page += 1
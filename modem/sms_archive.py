@@ -0,0 +1,309 @@
+"""
+SMS Archive module - Incremental SMS sync into a searchable SQLite archive
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import atexit
+import calendar
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import SMS_ARCHIVE_FILE, SMS_PAGE_SIZE, SMS_SEARCH_LIMIT
+from modem.sms import BOX_NAMES, INBOX, OUTBOX, SmsMessage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    box INTEGER NOT NULL,
+    sms_index INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    content TEXT NOT NULL,
+    date TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    sms_type INTEGER NOT NULL,
+    archived_at TEXT NOT NULL,
+    UNIQUE (box, sms_index, date, phone)
+);
+CREATE INDEX IF NOT EXISTS idx_messages_box ON messages(box);
+CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages(phone);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content, phone, content='messages', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content, phone) VALUES (new.id, new.content, new.phone);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content, phone)
+    VALUES ('delete', old.id, old.content, old.phone);
+END;
+CREATE TABLE IF NOT EXISTS watermarks (
+    box INTEGER PRIMARY KEY,
+    last_index INTEGER NOT NULL,
+    last_date TEXT NOT NULL,
+    synced_at TEXT
+);
+"""
+
+SELECT_MESSAGES = "SELECT sms_index, phone, content, date, box, status, sms_type FROM messages"
+SEARCH_COLUMNS = "m.sms_index, m.phone, m.content, m.date, m.box, m.status, m.sms_type"
+
+# Only a message that is already archived is skipped; an id clash raises
+INSERT_MESSAGE = """
+INSERT INTO messages (id, box, sms_index, phone, content, date, status, sms_type, archived_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (box, sms_index, date, phone) DO NOTHING
+"""
+
+# Row ids are the message date in seconds times ID_SLOTS plus a counter, so
+# id order is date order and date ranges are id ranges on every index
+ID_SLOTS = 1000
+
+_archive = None
+
+
+def date_id(date: str) -> int:
+    """
+    Smallest row id of a "YYYY-MM-DD[ HH:MM:SS]" date.
+    Raises ValueError for anything else.
+    """
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return calendar.timegm(time.strptime(date, fmt)) * ID_SLOTS
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date {date!r}, expected YYYY-MM-DD or YYYY-MM-DD HH:MM:SS")
+
+
+def _phrase(text: str) -> str:
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+def fts_query(text: str, phone: Optional[str] = None) -> str:
+    """
+    Turn free text into an FTS5 query that matches messages containing
+    every word. Words are quoted so punctuation cannot be a syntax error;
+    a trailing * keeps prefix search ("bal*"). With a phone, the query
+    also requires that number in the phone column, so the index merges
+    both instead of checking one sender's messages one by one.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            terms.append(_phrase(word) + ("*" if prefix else ""))
+    if not terms:
+        return ""
+    query = "{content} : (" + " ".join(terms) + ")"
+    if phone:
+        query = "{phone} : " + _phrase(phone) + " AND " + query
+    return query
+
+
+def parse_search(text: str) -> Dict[str, Optional[str]]:
+    """
+    Split a search string such as 'from:+15551234 since:2025-01-01 otp code'
+    into the filters of SmsArchive.search(); from:, since: and until:
+    set the phone and date range, the remaining words are the text query.
+    """
+    filters = {"phone": None, "since": None, "until": None}
+    words = []
+    for word in text.split():
+        name, sep, value = word.partition(":")
+        key = "phone" if name == "from" else name
+        if sep and value and key in filters:
+            filters[key] = value
+        else:
+            words.append(word)
+    filters["text"] = " ".join(words)
+    return filters
+
+
+def _row_to_message(row) -> SmsMessage:
+    index, phone, content, date, box, status, sms_type = row
+    return SmsMessage(index, phone, content, date, box=box, status=status, sms_type=sms_type)
+
+
+class SmsArchive:
+    """
+    Local SQLite archive of SMS messages.
+    For every box it keeps a watermark, the highest message index and date
+    already archived, so a sync only walks the modem's list (newest first)
+    until it reaches a message it has seen. With nothing new that is one
+    sms/sms-list request per box. Message content and numbers are kept in
+    an FTS5 full-text index for search().
+    """
+
+    def __init__(self, path: str = SMS_ARCHIVE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _next_id(self, date: str) -> int:
+        # Caller holds the lock
+        try:
+            base = date_id(date)
+        except ValueError:
+            # Messages without a usable date are kept, ordered before all others
+            base = 0
+        row = self._conn.execute(
+            "SELECT MAX(id) FROM messages WHERE id BETWEEN ? AND ?", (base, base + ID_SLOTS - 1)
+        ).fetchone()
+        if row[0] is None:
+            return base
+        if row[0] < base + ID_SLOTS - 1:
+            return row[0] + 1
+        # The date's slots are used up (e.g. many messages without a valid
+        # date): store it after the newest row rather than lose it
+        return self._conn.execute("SELECT MAX(id) FROM messages").fetchone()[0] + 1
+
+    def watermark(self, box: int) -> Optional[Tuple[int, str]]:
+        """(last_index, last_date) archived for a box, or None before its first sync"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_index, last_date FROM watermarks WHERE box = ?", (box,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def add(self, messages: List[SmsMessage]) -> int:
+        """
+        Archive messages in one transaction, ignoring ones already stored,
+        and raise the watermark of their boxes.
+        Returns:
+            Number of messages newly archived
+        """
+        now = datetime.now().isoformat()
+        marks: Dict[int, Tuple[int, str]] = {}
+        for m in messages:
+            index, date = marks.get(m.box, (m.index, m.date))
+            marks[m.box] = (max(index, m.index), max(date, m.date))
+
+        added = 0
+        with self._lock, self._conn:
+            for m in sorted(messages, key=lambda m: (m.date, m.index)):
+                added += self._conn.execute(INSERT_MESSAGE, (
+                    self._next_id(m.date), m.box, m.index, m.phone, m.content,
+                    m.date, m.status, m.sms_type, now
+                )).rowcount
+            for box, (index, date) in marks.items():
+                self._conn.execute(
+                    "INSERT INTO watermarks (box, last_index, last_date, synced_at) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(box) DO UPDATE SET "
+                    "last_index = MAX(last_index, excluded.last_index), "
+                    "last_date = MAX(last_date, excluded.last_date), "
+                    "synced_at = excluded.synced_at",
+                    (box, index, date, now)
+                )
+        return added
+
+    def sync(self, modem, box_types: Iterable[int] = (INBOX, OUTBOX),
+             page_size: int = SMS_PAGE_SIZE) -> Dict[str, int]:
+        """
+        Archive the messages that arrived since the last sync.
+        The walk over a box stops at the first message at or below the
+        watermark on both index and date; a message with a lower index but
+        a newer date (the modem renumbered after a reset) is still fetched.
+        Returns:
+            {box name: number of messages newly archived}
+        """
+        result = {}
+        for box in box_types:
+            mark = self.watermark(box)
+            stop = None
+            if mark:
+                last_index, last_date = mark
+                stop = lambda m: m.index <= last_index and m.date <= last_date  # noqa: E731
+            messages = list(modem.iter_sms(box_types=(box,), page_size=page_size, stop=stop))
+            result[BOX_NAMES.get(box, str(box))] = self.add(messages)
+        return result
+
+    def recent(self, limit: int = 10, box: Optional[int] = None) -> List[SmsMessage]:
+        """Newest archived messages, optionally from one box"""
+        where, params = ("WHERE box = ?", (box,)) if box is not None else ("", ())
+        with self._lock:
+            rows = self._conn.execute(
+                f"{SELECT_MESSAGES} {where} ORDER BY id DESC LIMIT ?",
+                params + (limit,)
+            ).fetchall()
+        return [_row_to_message(row) for row in rows]
+
+    def search(self, text: str = "", phone: Optional[str] = None, since: Optional[str] = None,
+               until: Optional[str] = None, box: Optional[int] = None,
+               limit: int = SMS_SEARCH_LIMIT) -> List[SmsMessage]:
+        """
+        Archived messages matching every given filter, newest first.
+        Args:
+            text: words that must all appear in the content (full-text index)
+            phone: exact sender/recipient number
+            since, until: date range, "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS";
+                          a bare until date includes that whole day.
+                          Any other format raises ValueError.
+            box: INBOX or OUTBOX, None for both
+            limit: maximum number of messages returned
+        """
+        clauses, params = [], []
+        match = fts_query(text, phone)
+        if match:
+            # Walk the full-text matches newest first and stop at the limit
+            source = "messages_fts JOIN messages m ON m.id = messages_fts.rowid"
+            row_id = "messages_fts.rowid"
+            clauses.append("messages_fts MATCH ?")
+            params.append(match)
+        else:
+            source, row_id = "messages m", "m.id"
+        if since:
+            clauses.append(f"{row_id} >= ?")
+            params.append(date_id(since))
+        if until:
+            until_id = date_id(until) + ID_SLOTS * (86400 if len(until) == 10 else 1)
+            clauses.append(f"{row_id} < ?")
+            params.append(until_id)
+        if phone:
+            clauses.append("m.phone = ?")
+            params.append(phone)
+        if box is not None:
+            clauses.append("m.box = ?")
+            params.append(box)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {SEARCH_COLUMNS} FROM {source} {where} ORDER BY {row_id} DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        return [_row_to_message(row) for row in rows]
+
+    def count(self, box: Optional[int] = None) -> int:
+        where, params = ("WHERE box = ?", (box,)) if box is not None else ("", ())
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM messages {where}", params).fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+def get_archive() -> SmsArchive:
+    """Return the process-wide SMS archive, opening it on first use"""
+    global _archive
+    if _archive is None:
+        _archive = SmsArchive(SMS_ARCHIVE_FILE)
+        atexit.register(_archive.close)
+    return _archive
@@ -0,0 +1,300 @@
+"""
+SMS Queue module - Persistent, rate-limited bulk SMS sending
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import atexit
+import csv
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+from config import (
+    SMS_QUEUE_FILE, SMS_SEND_RATE, SMS_SEND_BURST,
+    SMS_SEND_MAX_ATTEMPTS, SMS_SEND_RETRY_DELAY, SMS_QUEUE_DEDUPE_WINDOW
+)
+from modem.resilience import TokenBucket
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    content TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    sent_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(state, next_attempt);
+CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs(job_key, id);
+"""
+
+_queue = None
+
+
+def job_key(phone: str, content: str) -> str:
+    """Default deduplication key: the same text to the same number is one job"""
+    return hashlib.sha1(f"{phone}\n{content}".encode("utf-8")).hexdigest()
+
+
+def read_jobs_csv(stream: TextIO) -> Tuple[List[Tuple[str, str, Optional[str]]], List[str]]:
+    """
+    Read (number, text[, key]) rows from CSV. A first row starting with
+    "number" or "phone" is taken as a header; blank rows are skipped.
+    Returns:
+        (jobs, errors) with jobs as (phone, content, key or None)
+    """
+    jobs, errors = [], []
+    for line_number, row in enumerate(csv.reader(stream), 1):
+        if not any(cell.strip() for cell in row):
+            continue
+        if line_number == 1 and row[0].strip().lower() in ("number", "phone"):
+            continue
+        if len(row) < 2 or not row[0].strip() or not row[1]:
+            errors.append(f"line {line_number}: expected NUMBER,TEXT[,KEY]")
+            continue
+        key = row[2].strip() if len(row) > 2 and row[2].strip() else None
+        jobs.append((row[0].strip(), row[1], key))
+    return jobs, errors
+
+
+def _send_error(result) -> Optional[str]:
+    """Why a send_sms result is a failure, or None if it was accepted"""
+    if result is None:
+        return "not connected"
+    if isinstance(result, dict) and result.get('type') == 'error':
+        error = result.get('error')
+        if isinstance(error, dict):
+            return error.get('message') or "error {}".format(error.get('code'))
+        return str(error)
+    return None
+
+
+class SendReport:
+    """Counters of one SendQueue.run(); messages_per_minute covers sent messages"""
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def messages_per_minute(self) -> float:
+        return self.sent * 60 / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "elapsed_s": round(self.elapsed, 1),
+            "messages_per_minute": round(self.messages_per_minute, 1),
+        }
+
+
+class SendQueue:
+    """
+    SMS jobs stored in SQLite and sent through a token bucket.
+    Each job has a key (by default a hash of number and text). Adding a
+    key that is pending, failed or sent within SMS_QUEUE_DEDUPE_WINDOW
+    does nothing, so re-running the same batch after a restart only sends
+    what was not sent yet, while a recurring message is sent again once
+    the window has passed (or at once with resend=True). A failed send
+    is retried after retry_delay, doubling per attempt, until max_attempts
+    is reached and the job is marked failed.
+    """
+
+    def __init__(self, path: str = SMS_QUEUE_FILE):
+        self.path = path
+        self.report: Optional[SendReport] = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _is_duplicate(self, key: str, cutoff: str, resend: bool) -> bool:
+        # Caller holds the lock
+        row = self._conn.execute(
+            "SELECT state, sent_at FROM jobs WHERE job_key = ? ORDER BY id DESC LIMIT 1", (key,)
+        ).fetchone()
+        if row is None:
+            return False
+        state, sent_at = row
+        if state == PENDING:
+            return True
+        if resend:
+            return False
+        # Failed jobs come back through retry_failed(); sent ones expire
+        return state == FAILED or (sent_at or "") >= cutoff
+
+    def add(self, jobs: Iterable[Sequence], resend: bool = False,
+            dedupe_window: float = SMS_QUEUE_DEDUPE_WINDOW) -> Dict[str, int]:
+        """
+        Queue (number, text) or (number, text, key) jobs in one transaction.
+        A job is a duplicate while its key is pending, failed, or was sent
+        less than dedupe_window seconds ago; with resend=True only pending
+        keys are duplicates, which forces another send.
+        Returns:
+            {"added": new jobs, "duplicates": jobs skipped as duplicates}
+        """
+        now = datetime.now()
+        cutoff = (now - timedelta(seconds=dedupe_window)).isoformat()
+        added = duplicates = 0
+        with self._lock, self._conn:
+            for job in jobs:
+                phone, content = job[0], job[1]
+                key = job[2] if len(job) > 2 and job[2] else job_key(phone, content)
+                if self._is_duplicate(key, cutoff, resend):
+                    duplicates += 1
+                    continue
+                self._conn.execute(
+                    "INSERT INTO jobs (job_key, phone, content, created_at) VALUES (?, ?, ?, ?)",
+                    (key, phone, content, now.isoformat())
+                )
+                added += 1
+        return {"added": added, "duplicates": duplicates}
+
+    def add_csv(self, path: str, resend: bool = False) -> Dict:
+        """Queue the jobs of a CSV file; invalid rows are reported under "errors" """
+        with open(path, newline="", encoding="utf-8") as f:
+            jobs, errors = read_jobs_csv(f)
+        result = self.add(jobs, resend=resend)
+        result["errors"] = errors
+        return result
+
+    def counts(self) -> Dict[str, int]:
+        """Jobs per state"""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {PENDING: 0, SENT: 0, FAILED: 0}
+        counts.update(rows)
+        return counts
+
+    def retry_failed(self) -> int:
+        """Put jobs that ran out of attempts back in the queue"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE jobs SET state = ?, attempts = 0, next_attempt = 0 WHERE state = ?",
+                (PENDING, FAILED)
+            ).rowcount
+
+    def _next_job(self) -> Tuple[Optional[tuple], Optional[float]]:
+        """The oldest job due now, else the time the next pending job is due"""
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT id, phone, content, attempts FROM jobs "
+                "WHERE state = ? AND next_attempt <= ? ORDER BY next_attempt, id LIMIT 1",
+                (PENDING, time.time())
+            ).fetchone()
+            if job:
+                return job, None
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt) FROM jobs WHERE state = ?", (PENDING,)
+            ).fetchone()
+        return None, row[0]
+
+    def _record(self, job_id: int, attempts: int, error: Optional[str],
+                max_attempts: int, retry_delay: float) -> str:
+        if error is None:
+            state, next_attempt = SENT, 0
+        elif attempts >= max_attempts:
+            state, next_attempt = FAILED, 0
+        else:
+            state, next_attempt = PENDING, time.time() + retry_delay * 2 ** (attempts - 1)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, attempts = ?, next_attempt = ?, last_error = ?, "
+                "sent_at = ? WHERE id = ?",
+                (state, attempts, next_attempt, error,
+                 datetime.now().isoformat() if state == SENT else None, job_id)
+            )
+        return state
+
+    def run(self, modem, rate: float = SMS_SEND_RATE, burst: int = SMS_SEND_BURST,
+            max_attempts: int = SMS_SEND_MAX_ATTEMPTS, retry_delay: float = SMS_SEND_RETRY_DELAY,
+            on_result: Optional[Callable[[str, str, Optional[str]], None]] = None) -> Dict:
+        """
+        Send queued jobs until none is pending.
+        Args:
+            modem: logged-in HuaweiModem
+            rate: messages per minute (attempts, including retries)
+            burst: messages that may be sent back to back after a pause
+            max_attempts: attempts before a job is marked failed
+            retry_delay: seconds before the first retry of a failed send
+            on_result: called with (phone, state, error) after every attempt
+        Returns:
+            SendReport.as_dict() of this run plus the queue's job counts.
+            The report is also kept in self.report while running, so it can
+            be shown if the run is interrupted.
+        """
+        bucket = TokenBucket(rate / 60.0, burst)
+        report = self.report = SendReport()
+        while True:
+            job, due = self._next_job()
+            if job is None:
+                if due is None:
+                    break
+                # Only retries waiting for their delay are left
+                time.sleep(max(due - time.time(), 0.0))
+                continue
+
+            job_id, phone, content, attempts = job
+            bucket.acquire()
+            try:
+                error = _send_error(modem.send_sms(phone, content))
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+            state = self._record(job_id, attempts + 1, error, max_attempts, retry_delay)
+            if state == SENT:
+                report.sent += 1
+            elif state == FAILED:
+                report.failed += 1
+            else:
+                report.retried += 1
+            if on_result:
+                on_result(phone, state, error)
+
+        report.finished = time.monotonic()
+        return dict(report.as_dict(), queue=self.counts())
+
+    def close(self):
+        self._conn.close()
+
+
+def get_queue() -> SendQueue:
+    """Return the process-wide SMS send queue, opening it on first use"""
+    global _queue
+    if _queue is None:
+        _queue = SendQueue(SMS_QUEUE_FILE)
+        atexit.register(_queue.close)
+    return _queue
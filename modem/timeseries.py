@@ -0,0 +1,255 @@
+"""
+Time Series module - Fixed-size ring buffers for numeric status samples
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import math
+import mmap
+import os
+import re
+import struct
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import TIMESERIES_CAPACITY, TIMESERIES_FIELDS
+
+# File layout: header, NUL-separated field names padded to 8 bytes, then the
+# timestamp column and one column per field, each `capacity` float64 values.
+MAGIC = b"HRTS"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIII")  # magic, version, n_fields, capacity, count, head, names_len
+COUNT_OFFSET = 12  # count and head are rewritten in place on every append
+
+_NUMBER = re.compile(r'[-+]?\d+(?:\.\d+)?')
+
+
+def parse_number(value) -> float:
+    """Extract the number from values like '4', '-95dBm' or '>=-51dBm' (NaN if none)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value)) if value is not None else None
+    return float(match.group()) if match else math.nan
+
+
+def _pad8(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class StatusSeries:
+    """
+    Ring buffer of timestamped samples for a fixed set of numeric fields.
+    Storage is one float64 column per field plus a timestamp column, so
+    memory use depends only on capacity. Missing values are stored as NaN.
+    Timestamps must not go backwards, which keeps range queries a binary
+    search.
+    """
+
+    def __init__(self, fields: Iterable[str] = TIMESERIES_FIELDS,
+                 capacity: int = TIMESERIES_CAPACITY):
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.count = 0
+        self.head = 0  # physical index of the next write
+        self._ts = array('d', [0.0]) * capacity
+        self._columns = {f: array('d', [math.nan]) * capacity for f in self.fields}
+        self._mmap: Optional[mmap.mmap] = None
+        self._readonly = False
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _physical(self, logical: int) -> int:
+        return (self.head - self.count + logical) % self.capacity
+
+    def _timestamp(self, logical: int) -> float:
+        return self._ts[self._physical(logical)]
+
+    def append(self, values: Dict[str, object], timestamp: Optional[float] = None):
+        """Add one sample; fields not in values are stored as NaN"""
+        if self._readonly:
+            raise ValueError("Series was loaded read-only")
+        ts = time.time() if timestamp is None else float(timestamp)
+        if self.count and ts < self._timestamp(self.count - 1):
+            raise ValueError("Timestamps must not go backwards")
+
+        i = self.head
+        self._ts[i] = ts
+        for field, column in self._columns.items():
+            column[i] = parse_number(values.get(field))
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        if self._mmap is not None:
+            struct.pack_into("<II", self._mmap, COUNT_OFFSET, self.count, self.head)
+
+    def _bisect(self, ts: float, right: bool = False) -> int:
+        """First logical index whose timestamp is >= ts (> ts if right)"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            t = self._timestamp(mid)
+            if t < ts or (right and t == ts):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def range(self, field: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> List[Tuple[float, float]]:
+        """Return (timestamp, value) pairs with start <= timestamp <= end, skipping NaN"""
+        column = self._columns[field]
+        first = 0 if start is None else self._bisect(start)
+        last = self.count if end is None else self._bisect(end, right=True)
+        samples = []
+        for logical in range(first, last):
+            i = self._physical(logical)
+            if not math.isnan(column[i]):
+                samples.append((self._ts[i], column[i]))
+        return samples
+
+    def downsample(self, field: str, bucket_seconds: float, start: Optional[float] = None,
+                   end: Optional[float] = None) -> List[Dict[str, float]]:
+        """
+        Aggregate samples into fixed-width time buckets.
+        Returns:
+            list of {"start", "min", "max", "mean", "count"} per non-empty bucket
+        """
+        buckets: List[Dict[str, float]] = []
+        current = None
+        total = 0.0
+        for ts, value in self.range(field, start, end):
+            bucket_start = math.floor(ts / bucket_seconds) * bucket_seconds
+            if current is None or current["start"] != bucket_start:
+                if current is not None:
+                    current["mean"] = total / current["count"]
+                    buckets.append(current)
+                current = {"start": bucket_start, "min": value, "max": value, "count": 0}
+                total = 0.0
+            current["min"] = min(current["min"], value)
+            current["max"] = max(current["max"], value)
+            current["count"] += 1
+            total += value
+        if current is not None:
+            current["mean"] = total / current["count"]
+            buckets.append(current)
+        return buckets
+
+    @property
+    def is_mapped(self) -> bool:
+        return self._mmap is not None or self._readonly
+
+    def flush(self):
+        """Flush samples appended to a writable memory-mapped series"""
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def save(self, path: str):
+        """Write the series to a compact binary file (atomically)"""
+        names = "\0".join(self.fields).encode("utf-8")
+        header = HEADER.pack(MAGIC, VERSION, len(self.fields), self.capacity,
+                             self.count, self.head, len(names))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(names.ljust(_pad8(HEADER.size + len(names)) - HEADER.size, b"\0"))
+            f.write(bytes(memoryview(self._ts).cast('B')))
+            for field in self.fields:
+                f.write(bytes(memoryview(self._columns[field]).cast('B')))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, writable: bool = False) -> "StatusSeries":
+        """
+        Memory-map a file written by save(). Columns are views into the
+        mapping, so nothing is copied; with writable=True new samples are
+        written straight through to the file.
+        """
+        with open(path, 'r+b' if writable else 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+
+        magic, version, n_fields, capacity, count, head, names_len = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            raise ValueError(f"{path} is not a time series file")
+
+        names_start = HEADER.size
+        fields = bytes(mm[names_start:names_start + names_len]).decode("utf-8").split("\0") if n_fields else []
+        offset = _pad8(names_start + names_len)
+        column_size = 8 * capacity
+        if len(mm) < offset + column_size * (n_fields + 1):
+            mm.close()
+            raise ValueError(f"{path} is truncated")
+
+        series = cls.__new__(cls)
+        series.fields = tuple(fields)
+        series.capacity = capacity
+        series.count = count
+        series.head = head
+        view = memoryview(mm)
+        series._ts = view[offset:offset + column_size].cast('d')
+        series._columns = {}
+        for n, field in enumerate(fields, 1):
+            start = offset + n * column_size
+            series._columns[field] = view[start:start + column_size].cast('d')
+        series._mmap = mm if writable else None
+        series._readonly = not writable
+        return series
+
+
+class TimeSeriesStore:
+    """Status series keyed per modem, persisted as one file per modem"""
+
+    def __init__(self, fields: Iterable[str] = TIMESERIES_FIELDS,
+                 capacity: int = TIMESERIES_CAPACITY):
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.series: Dict[str, StatusSeries] = {}
+
+    def get(self, modem_host: str) -> StatusSeries:
+        """Return the series of a modem, creating it on first use"""
+        if modem_host not in self.series:
+            self.series[modem_host] = StatusSeries(self.fields, self.capacity)
+        return self.series[modem_host]
+
+    def record(self, modem_host: str, *responses: Optional[Dict], timestamp: Optional[float] = None):
+        """Append one sample built from the 'response' parts of API results"""
+        values: Dict[str, object] = {}
+        for response in responses:
+            if isinstance(response, dict) and response.get('type') != 'error':
+                values.update(response.get('response') or {})
+        self.get(modem_host).append(values, timestamp)
+
+    @staticmethod
+    def _file_name(modem_host: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', modem_host) + ".ts"
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        for modem_host, series in self.series.items():
+            if series.is_mapped:
+                # Mapped series already live in their file
+                series.flush()
+            else:
+                series.save(os.path.join(directory, self._file_name(modem_host)))
+
+    def load(self, directory: str, modem_host: str, writable: bool = False) -> Optional[StatusSeries]:
+        """Memory-map a previously saved series for a modem, if there is one"""
+        path = os.path.join(directory, self._file_name(modem_host))
+        if not os.path.exists(path):
+            return None
+        self.series[modem_host] = StatusSeries.load(path, writable=writable)
+        return self.series[modem_host]
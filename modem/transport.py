@@ -0,0 +1,167 @@
+"""
+Transport module - Pooled keep-alive HTTP transport for modem API calls
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+import huaweisms.api.common
+
+
+class TransportStats:
+    """Thread-safe request and connection counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    @property
+    def reused_connections(self) -> int:
+        # Every request runs on exactly one connection, so whatever was not
+        # freshly opened came out of the keep-alive pool.
+        return max(self.requests - self.new_connections, 0)
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(self.requests - self.new_connections, 0),
+            }
+
+
+def _counting_pool_class(base, stats):
+    """Subclass a urllib3 connection pool so new connections are counted"""
+    class CountingConnectionPool(base):
+        def _new_conn(self):
+            stats.record_new_connection()
+            return super()._new_conn()
+    return CountingConnectionPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report every new connection"""
+
+    def __init__(self, stats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool_class(pool_class, self._stats)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+class ModemTransport:
+    """
+    Keep-alive HTTP session to a single modem.
+    All API reads and writes go through get() and post(), which reuse pooled
+    connections and parse responses the same way huaweisms does.
+    """
+
+    def __init__(self, modem_host: str, pool_size: int = 4,
+                 connect_timeout: float = 5.0, read_timeout: float = 15.0,
+                 recorder=None):
+        self.modem_host = modem_host
+        # Optional LatencyRecorder told about every request (modem.profiling)
+        self.recorder = recorder
+        self.timeout = (connect_timeout, read_timeout)
+        self.stats = TransportStats()
+        self._token_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update(huaweisms.api.common.common_headers())
+        adapter = _CountingAdapter(
+            self.stats,
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _url(self, ctx, endpoint: str) -> str:
+        return "{}/{}".format(ctx.api_base_url, endpoint.lstrip('/'))
+
+    def _cookies(self, ctx) -> Optional[Dict[str, str]]:
+        return huaweisms.api.common.build_cookies(ctx)
+
+    def _handle_response(self, response, ctx) -> Dict:
+        huaweisms.api.common.check_response_headers(response, ctx)
+        return huaweisms.api.common.api_response(response)
+
+    def _exchange(self, ctx, endpoint: str, send, bytes_out: int = 0) -> Dict:
+        """Run one HTTP request, parse it and report it to the recorder"""
+        self.stats.record_request()
+        start = time.perf_counter()
+        outcome, bytes_in = "ok", 0
+        try:
+            response = send()
+            bytes_in = len(response.content or b"")
+            result = self._handle_response(response, ctx)
+            if isinstance(result, dict) and result.get('type') == 'error':
+                error = result.get('error')
+                outcome = "error {}".format(error.get('code') if isinstance(error, dict) else "")
+            return result
+        except Exception as e:
+            outcome = e.__class__.__name__
+            raise
+        finally:
+            if self.recorder is not None:
+                self.recorder.record(endpoint, time.perf_counter() - start,
+                                     bytes_out, bytes_in, outcome)
+
+    def get(self, ctx, endpoint: str) -> Dict:
+        """GET an API endpoint, e.g. 'monitoring/status'"""
+        return self._exchange(ctx, endpoint, lambda: self.session.get(
+            self._url(ctx, endpoint),
+            cookies=self._cookies(ctx),
+            timeout=self.timeout,
+        ))
+
+    def post(self, ctx, endpoint: str, xml_data: str, with_token: bool = True) -> Dict:
+        """POST an XML payload to an API endpoint, attaching a verification token"""
+        headers = {}
+        if with_token:
+            with self._token_lock:
+                headers["__RequestVerificationToken"] = ctx.token
+        return self._exchange(ctx, endpoint, lambda: self.session.post(
+            self._url(ctx, endpoint),
+            data=xml_data,
+            headers=headers,
+            cookies=self._cookies(ctx),
+            timeout=self.timeout,
+        ), bytes_out=len(xml_data.encode("utf-8")))
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
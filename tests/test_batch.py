@@ -0,0 +1,42 @@
+"""
+Tests for batch operation parsing (modem/batch.py)
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+from modem.batch import parse_operation, read_operations
+
+
+class ParseOperationTest(unittest.TestCase):
+
+    def test_limit(self):
+        self.assertEqual(parse_operation("limit AA:BB:CC:DD:EE:FF 100 500"),
+                         ("limit", ["AA:BB:CC:DD:EE:FF", "100", "500"]))
+
+    def test_limit_invalid_mac(self):
+        with self.assertRaisesRegex(ValueError, "Usage: limit MAC UPLOAD DOWNLOAD"):
+            parse_operation("limit not-a-mac 100 500")
+
+    def test_invalid_mac_is_reported_per_line(self):
+        parsed = read_operations(["block AA:BB:CC:DD:EE:FF", "unblock AA:BB:CC"])
+        self.assertEqual(parsed[0][1], ("block", ["AA:BB:CC:DD:EE:FF"]))
+        self.assertIsInstance(parsed[1][1], ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
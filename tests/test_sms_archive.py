@@ -0,0 +1,74 @@
+"""
+Tests for the SMS archive search (modem/sms_archive.py)
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import tempfile
+import unittest
+
+from modem.batch import read_operations, run_operations
+from modem.sms import SmsMessage
+from modem.sms_archive import SmsArchive
+
+
+class ArchiveModem:
+    """Only what the sms-search operation needs"""
+
+    def __init__(self, archive):
+        self.archive = archive
+
+    def fetch_many(self, calls):
+        return {}
+
+    def search_sms(self, query):
+        from modem import HuaweiModem
+        return HuaweiModem.search_sms(self, query, archive=self.archive)
+
+
+class SmsArchiveSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive = SmsArchive(os.path.join(self.directory.name, "sms_archive.db"))
+        self.archive.add([
+            SmsMessage(1, "MyBank", "Your OTP code is 123456", "2025-01-01 10:00:00"),
+            SmsMessage(2, "MyBank", "Your OTP code is 654321", "2025-01-02 10:00:00"),
+        ])
+
+    def tearDown(self):
+        self.archive.close()
+        self.directory.cleanup()
+
+    def test_date_range(self):
+        found = self.archive.search("otp", since="2025-01-02", until="2025-01-02")
+        self.assertEqual([m.index for m in found], [2])
+
+    def test_invalid_date_raises(self):
+        for filters in ({"since": "2025-13-01"}, {"until": "01/02/2025"}, {"since": "yesterday"}):
+            with self.assertRaises(ValueError):
+                self.archive.search("otp", **filters)
+
+    def test_invalid_date_is_a_cli_error(self):
+        results = list(run_operations(ArchiveModem(self.archive),
+                                      read_operations(["sms-search 'since:2025-1-x otp'"])))
+        self.assertFalse(results[0]["ok"])
+        self.assertIn("Invalid date", results[0]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests for the persistent SMS send queue (modem/sms_queue.py)
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import tempfile
+import unittest
+
+from modem.sms_queue import SendQueue
+
+
+class FakeModem:
+    """Accepts every send and remembers it"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_sms(self, phone, content):
+        self.sent.append((phone, content))
+        return {"type": "response", "response": "OK"}
+
+
+class SendQueueDedupeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.queue = SendQueue(os.path.join(self.directory.name, "sms_queue.db"))
+        self.modem = FakeModem()
+
+    def tearDown(self):
+        self.queue.close()
+        self.directory.cleanup()
+
+    def send(self, jobs, **kwargs):
+        added = self.queue.add(jobs, **kwargs)
+        self.queue.run(self.modem, rate=6000)
+        return added
+
+    def test_pending_job_is_not_queued_twice(self):
+        self.assertEqual(self.queue.add([("+15550001", "hello"), ("+15550001", "hello")]),
+                         {"added": 1, "duplicates": 1})
+
+    def test_recent_send_is_skipped_on_restart(self):
+        self.send([("+15550001", "hello")])
+        self.assertEqual(self.send([("+15550001", "hello")]), {"added": 0, "duplicates": 1})
+        self.assertEqual(self.modem.sent, [("+15550001", "hello")])
+
+    def test_message_is_sent_again_after_the_window(self):
+        self.send([("+15550001", "balance low")])
+        self.assertEqual(self.send([("+15550001", "balance low")], dedupe_window=0),
+                         {"added": 1, "duplicates": 0})
+        self.assertEqual(len(self.modem.sent), 2)
+
+    def test_resend_forces_a_recent_message(self):
+        self.send([("+15550001", "hello")])
+        self.assertEqual(self.send([("+15550001", "hello")], resend=True),
+                         {"added": 1, "duplicates": 0})
+        self.assertEqual(len(self.modem.sent), 2)
+        self.assertEqual(self.queue.counts()["sent"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
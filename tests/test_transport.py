@@ -0,0 +1,52 @@
+"""
+Tests for the lazily created modem transport (modem/__init__.py)
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from modem import HuaweiModem
+
+
+class SlowTransport:
+    """Stands in for ModemTransport; slow to build so threads overlap"""
+
+    def __init__(self, *args, **kwargs):
+        time.sleep(0.01)
+
+
+class TransportTest(unittest.TestCase):
+
+    def test_concurrent_first_access_creates_one_transport(self):
+        modem = HuaweiModem("admin", "admin", "127.0.0.1")
+        seen = []
+        with mock.patch("modem.transport.ModemTransport", SlowTransport):
+            threads = [threading.Thread(target=lambda: seen.append(modem.transport))
+                       for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(len(seen), 8)
+        self.assertEqual(len({id(t) for t in seen}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Render module - Buffered terminal output with automatic color handling
+
+Copyright (C) 2025 Islamux
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import re
+import sys
+from typing import Iterator, List, Optional, TextIO
+
+from utils.colors import Colors
+from config import RENDER_CHUNK_SIZE
+
+_ANSI = re.compile(r'\x1b\[[0-9;]*m')
+
+
+def use_color(stream: TextIO) -> bool:
+    """Colors are used only on a terminal, and never when NO_COLOR is set"""
+    if os.environ.get("NO_COLOR"):
+        return False
+    isatty = getattr(stream, "isatty", None)
+    return bool(isatty and isatty())
+
+
+def strip_colors(text: str) -> str:
+    return _ANSI.sub("", text)
+
+
+def iter_key_value(key, value, indent: int = 0) -> Iterator[str]:
+    """
+    Lines of a nested key/value listing: dicts and lists are indented
+    below their key and list items are numbered. Iterative, so deeply
+    nested responses cannot hit the recursion limit.
+    """
+    stack = [(key, value, indent, False)]
+    while stack:
+        key, value, indent, numbered = stack.pop()
+        indent_str = " " * indent
+        if numbered:
+            # A dict item of a list: number it and list its fields below
+            yield f"{indent_str}[{key}]"
+            children = [(k, v, indent + 2, False) for k, v in value.items()]
+        elif isinstance(value, dict):
+            yield f"{indent_str}{Colors.OKBLUE}{key}:{Colors.ENDC}"
+            children = [(k, v, indent + 2, False) for k, v in value.items()]
+        elif isinstance(value, list):
+            yield f"{indent_str}{Colors.OKBLUE}{key}:{Colors.ENDC}"
+            children = [
+                (i, item, indent + 2, True) if isinstance(item, dict)
+                else (f"[{i}]", item, indent + 2, False)
+                for i, item in enumerate(value, 1)
+            ]
+        else:
+            yield f"{indent_str}{Colors.OKBLUE}{key}:{Colors.ENDC} {Colors.OKGREEN}{value}{Colors.ENDC}"
+            continue
+        stack.extend(reversed(children))
+
+
+class Renderer:
+    """
+    Collects a screen of output in memory and writes it with one call.
+    Output larger than chunk_size is written in chunks of about that size
+    as it is produced, so huge responses never sit in memory whole. ANSI
+    colors are stripped when the stream is not a terminal.
+
+        with Renderer() as out:
+            out.section_header("Connected Hosts")
+            out.key_value("Hosts", hosts)
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, color: Optional[bool] = None,
+                 chunk_size: int = RENDER_CHUNK_SIZE):
+        self.stream = stream or sys.stdout
+        self.color = use_color(self.stream) if color is None else color
+        self.chunk_size = chunk_size
+        self.writes = 0
+        self._parts: List[str] = []
+        self._size = 0
+
+    def write(self, text: str):
+        """Buffer raw text, writing out a chunk once the buffer is full"""
+        if not self.color:
+            text = strip_colors(text)
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.chunk_size:
+            self._write_out()
+
+    def line(self, text: str = ""):
+        self.write(text + "\n")
+
+    def lines(self, lines):
+        for text in lines:
+            self.line(text)
+
+    def section_header(self, title: str):
+        border = Colors.HEADER + "=" * (len(title) + 4) + Colors.ENDC
+        self.line(f"\n{border}")
+        self.line(f"{Colors.HEADER}{Colors.BOLD}  {title}  {Colors.ENDC}")
+        self.line(border)
+
+    def key_value(self, key, value, indent: int = 0):
+        self.lines(iter_key_value(key, value, indent))
+
+    def error(self, message: str):
+        self.line(f"{Colors.FAIL}❌ {message}{Colors.ENDC}")
+
+    def success(self, message: str):
+        self.line(f"{Colors.OKGREEN}✓ {message}{Colors.ENDC}")
+
+    def info(self, message: str):
+        self.line(f"{Colors.OKBLUE}ℹ {message}{Colors.ENDC}")
+
+    def prompt(self, text: str) -> str:
+        """Write out everything buffered, then read a line of input"""
+        self.flush()
+        return input(strip_colors(text) if not self.color else text)
+
+    def _write_out(self):
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self.writes += 1
+            self._parts = []
+            self._size = 0
+
+    def flush(self):
+        self._write_out()
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        return False